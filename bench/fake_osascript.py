@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Stand-in for /usr/bin/osascript used by guardian_bench.py off-Mac.
+
+Emulates only what guardian.py sends it:
+  osascript -l JavaScript -e SCRIPT            one tab snapshot (JSON) on stdout
+  osascript -l JavaScript -e SCRIPT serve      one snapshot line per stdin line
+  osascript -e APPLESCRIPT                     legacy "url|||title" lines
+
+Tab count comes from FAKE_TABS (default 50), split across FAKE_BROWSERS.
+FAKE_EVENT_MS adds a fixed per-browser Apple Event latency.
+FAKE_TAB_EVENT_US adds a per-property Apple Event latency to the legacy path,
+which read `URL of t` and `title of t` one tab at a time.
+
+The legacy path rebuilds its output string on every tab, like the old
+`set out to out & ... & linefeed` loop, so its cost grows with n².
+"""
+
+import os
+import sys
+import json
+import time
+
+N_TABS = int(os.environ.get("FAKE_TABS", "50"))
+BROWSERS = os.environ.get("FAKE_BROWSERS", "Google Chrome,Safari").split(",")
+EVENT_S = float(os.environ.get("FAKE_EVENT_MS", "0")) / 1000
+TAB_EVENT_S = float(os.environ.get("FAKE_TAB_EVENT_US", "0")) / 1e6
+
+
+def _tabs():
+    per = max(1, N_TABS // len(BROWSERS))
+    out = []
+    for b in BROWSERS:
+        time.sleep(EVENT_S)
+        for i in range(per):
+            out.append([b, f"https://docs.example.com/{b[:3].lower()}/{i}",
+                        f"Example page {i} — documentation", 1 if i == 0 else 0])
+    return out
+
+
+def main():
+    argv = sys.argv[1:]
+    if "-l" in argv and "JavaScript" in argv:
+        if argv[-1] == "serve":
+            for _ in sys.stdin.buffer:
+                sys.stdout.write(json.dumps(_tabs()) + "\n")
+                sys.stdout.flush()
+            return
+        print(json.dumps(_tabs()))
+        return
+    # Legacy AppleScript tab listing: one browser per invocation, two
+    # property reads per tab, and a full copy of `out` on every append
+    time.sleep(EVENT_S)
+    per = max(1, N_TABS // len(BROWSERS))
+    out = ""
+    for i in range(per):
+        if TAB_EVENT_S:
+            time.sleep(2 * TAB_EVENT_S)
+        out = "".join((out, f"https://docs.example.com/{i}", "|||",
+                       f"Example page {i} — documentation", "\n"))
+    sys.stdout.write(out)
+
+
+if __name__ == "__main__":
+    main()
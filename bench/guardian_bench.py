@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+You Are Loved — Guardian benchmarks
+
+Developer-only harness (not installed). Each subcommand measures one part of
+guardian.py in isolation so changes can be compared before/after:
+
+  startup   -X importtime profile of `import guardian` + one-shot CLI wall time
+  tabs      Layer T2 tab enumeration vs tab count, using fake_osascript.py
+  procs     Layer P process enumeration: `ps` fork vs in-process backends
+  replay    Layer V over a frame set: inferences per frame and verdict parity,
+            fixed grid vs uniform-tile skipping vs + skin prefilter
+  multimon  Layer V on synthetic multi-display frame sets: one display at a
+            time vs concurrent vs scheduled (only the changed focus display)
+  pyramid   per-cycle resampling: each layer resizing on its own (T1 LANCZOS
+            tiles, prefilter thumbnail, SR subsample, detector downscale) vs
+            one shared FramePyramid
+  textfilter
+            Layer T1 text prefilter on text-over-photo frames (captions,
+            thumbnail titles, subtitles), a lone word per tile on a blank
+            6K display, and controls: TextStats per grid
+            tile and how each is classified (text / image-only / empty)
+
+Usage:
+  python3 bench/guardian_bench.py startup [--runs 5]
+  python3 bench/guardian_bench.py tabs [--sizes 10,100,500,1000] [--tab-event-us 50]
+  python3 bench/guardian_bench.py procs [--runs 50]
+  python3 bench/guardian_bench.py replay [--frames DIR | --synthetic 6]
+  python3 bench/guardian_bench.py multimon [--displays 3] [--workers 8] [--infer-ms 40 | --real]
+  python3 bench/guardian_bench.py pyramid [--size 2880x1800] [--runs 5]
+  python3 bench/guardian_bench.py textfilter [--frames DIR] [--size 2880x1800]
+                                             [--sparse-size 6016x3384]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+HEAVY_MODULES = ("pytesseract", "PIL", "Quartz", "nudenet", "cv2", "numpy",
+                 "onnxruntime", "mss", "urllib.request")
+
+
+def _fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f} ms"
+
+
+# ---------------------------------------------------------------------------
+# startup
+# ---------------------------------------------------------------------------
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importtime_profile() -> list:
+    """Return [(module, self_us, cumulative_us, depth)] for `import guardian`."""
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import guardian"],
+        cwd=str(REPO), capture_output=True, text=True, timeout=120)
+    rows = []
+    for line in r.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)),
+                         len(m.group(3)) // 2))
+    return rows
+
+
+def bench_startup(args):
+    rows = _importtime_profile()
+    guardian_row = next((r for r in rows if r[0] == "guardian"), None)
+    if guardian_row is None:
+        print("import guardian failed — run from a checkout with its dependencies")
+        return 1
+
+    print("=== import guardian (-X importtime) ===")
+    print(f"  cumulative: {guardian_row[2] / 1000:.1f} ms "
+          f"(self {guardian_row[1] / 1000:.1f} ms)")
+    heavy = [r for r in rows if r[0].split(".")[0] in HEAVY_MODULES or r[0] in HEAVY_MODULES]
+    print(f"  heavy modules loaded at import: "
+          f"{', '.join(sorted({r[0] for r in heavy if r[3] <= 1})) or 'none'}")
+    print("  top direct imports:")
+    direct = sorted((r for r in rows if r[3] == 1), key=lambda r: -r[2])
+    for name, self_us, cum_us, _ in direct[:args.top]:
+        print(f"    {name:<28} {cum_us / 1000:8.1f} ms")
+
+    print(f"\n=== one-shot CLI wall time ({args.runs} runs) ===")
+    for label, argv in (("python -c pass", ["-c", "pass"]),
+                        ("import guardian", ["-c", "import guardian"]),
+                        ("guardian.py --help", [str(REPO / "guardian.py"), "--help"])):
+        times = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable] + argv, cwd=str(REPO),
+                           capture_output=True, timeout=120)
+            times.append(time.perf_counter() - t0)
+        print(f"  {label:<22} median {_fmt_ms(statistics.median(times))}  "
+              f"min {_fmt_ms(min(times))}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# tabs
+# ---------------------------------------------------------------------------
+
+def _install_fake_osascript() -> str:
+    """Put an `osascript` shim running fake_osascript.py first on PATH."""
+    shim_dir = tempfile.mkdtemp(prefix="yal_bench_")
+    shim = Path(shim_dir) / "osascript"
+    shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" '
+                    f'"{REPO / "bench" / "fake_osascript.py"}" "$@"\n')
+    shim.chmod(0o755)
+    os.environ["PATH"] = shim_dir + os.pathsep + os.environ.get("PATH", "")
+    return shim_dir
+
+
+def _time_runs(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def bench_tabs(args):
+    import guardian
+    _install_fake_osascript()
+    os.environ["FAKE_BROWSERS"] = ",".join(guardian.BROWSERS)
+    os.environ["FAKE_EVENT_MS"] = str(args.event_ms)
+    os.environ["FAKE_TAB_EVENT_US"] = str(args.tab_event_us)
+
+    def legacy():
+        # Old layer_T2: one osascript spawn per browser (Chrome, Safari only),
+        # per-tab property reads and O(n²) string building in the fake
+        for _ in range(2):
+            out = guardian._osascript("tell application \"System Events\" to return")
+            [line.split("|||", 1) for line in out.split("\n") if "|||" in line]
+
+    class OneShotEnumerator(guardian.TabEnumerator):
+        def _query_helper(self):
+            raise RuntimeError("persistent helper disabled for bench")
+
+    print(f"=== Tab enumeration (fake osascript, {args.event_ms}ms/browser event, "
+          f"median of {args.runs}) ===")
+    print(f"  {'tabs':>6}  {'legacy 2x spawn':>16}  {'helper one-shot':>16}  "
+          f"{'helper persistent':>18}  {'us/tab':>7}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        os.environ["FAKE_TABS"] = str(n)
+        enum = guardian.TabEnumerator(guardian.BROWSERS)
+        got = len(enum.snapshot())          # spawns the helper
+        t_persist = _time_runs(enum.snapshot, args.runs)
+        enum.close()
+        oneshot = OneShotEnumerator(guardian.BROWSERS)
+        t_oneshot = _time_runs(oneshot.snapshot, args.runs)
+        t_legacy = _time_runs(legacy, args.runs)
+        print(f"  {got:>6}  {_fmt_ms(t_legacy):>16}  {_fmt_ms(t_oneshot):>16}  "
+              f"{_fmt_ms(t_persist):>18}  {1e6 * t_persist / max(1, got):7.1f}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# procs
+# ---------------------------------------------------------------------------
+
+def bench_procs(args):
+    import guardian
+    print(f"=== Process enumeration (median of {args.runs}) ===")
+    print(f"  {'backend':<10} {'procs':>6}  {'cold':>11}  {'warm':>11}  {'full refresh':>12}")
+    for choice in ("ps", "libproc", "psutil", "procfs"):
+        table = guardian.ProcessTable(choice)
+        if table.backend != choice:
+            print(f"  {choice:<10} unavailable")
+            continue
+        t0 = time.perf_counter()
+        n = len(table.names())
+        cold = time.perf_counter() - t0
+        warm = _time_runs(table.names, args.runs)
+        table._full_refresh = 0.0           # re-resolve every PID each call
+        full = _time_runs(table.names, args.runs)
+        print(f"  {choice:<10} {n:>6}  {_fmt_ms(cold)}  {_fmt_ms(warm)}  {_fmt_ms(full)}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# replay
+# ---------------------------------------------------------------------------
+
+def _synthetic_frames(n: int, size=(2560, 1440)) -> list:
+    """Desktop-like frames: blank editor, code editor, photo grid (cycled)."""
+    import numpy as np
+    from PIL import Image, ImageDraw
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(n):
+        kind = ("blank", "code", "photos")[i % 3]
+        img = Image.new("RGB", size, (30, 30, 30))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((0, 0, size[0], 40), fill=(50, 50, 50))
+        if kind == "code":
+            for line in range(0, size[1] // 3, 18):
+                draw.text((60, 60 + line), "def handler(event): return " + "x" * (line % 40),
+                          fill=(200, 200, 150))
+        elif kind == "photos":
+            for y in range(60, size[1] - 300, 320):
+                for x in range(20, size[0] - 300, 320):
+                    base = rng.integers(60, 200, 3)
+                    grad = np.linspace(0, 60, 300)[None, :, None]
+                    tile = np.clip(base + grad + rng.normal(0, 12, (300, 300, 3)), 0, 255)
+                    img.paste(Image.fromarray(tile.astype("uint8")), (x, y))
+        frames.append((f"{kind}_{i}", img, None))
+    return frames
+
+
+def bench_replay(args):
+    import guardian
+    if args.frames:
+        frames = guardian._load_labeled_frames(Path(args.frames).expanduser())
+    else:
+        frames = _synthetic_frames(args.synthetic)
+    if not frames:
+        print("no frames")
+        return 1
+
+    calls = []
+    real_scan_tile = guardian.scan_tile
+
+    def counting_scan_tile(detector, name, tile, mon_idx):
+        calls.append(name)
+        return real_scan_tile(detector, name, tile, mon_idx)
+
+    guardian.scan_tile = counting_scan_tile
+    guardian.warm_detector(guardian.get_detector())
+    config = guardian.load_config()
+    modes = (("fixed", {"adaptive_tiling": False, "skin_prefilter": False}),
+             ("uniform", {"adaptive_tiling": True, "skin_prefilter": False}),
+             ("+skin", {"adaptive_tiling": True, "skin_prefilter": True}))
+    results = {}
+    for mode, overrides in modes:
+        guardian.load_config = lambda: dict(config, **overrides)
+        for name, img, _label in frames:
+            calls.clear()
+            t0 = time.perf_counter()
+            result = guardian.layer_V([img])
+            results[mode, name] = (len(calls), time.perf_counter() - t0,
+                                   bool(result[0]), result[1])
+
+    print(f"=== Layer V replay ({len(frames)} frames): inferences / latency ===")
+    print(f"  {'frame':<20}" + "".join(f" {m:>20}" for m, _ in modes) + "  verdict")
+    mismatches = 0
+    for name, _img, _label in frames:
+        base = results["fixed", name]
+        same = all(results[m, name][2:] == base[2:] for m, _ in modes)
+        mismatches += not same
+        cols = "".join(f" {results[m, name][0]:>5} {_fmt_ms(results[m, name][1]):>14}"
+                       for m, _ in modes)
+        print(f"  {name[:20]:<20}{cols}  {'same' if same else 'DIFF'} "
+              f"({'hit' if base[2] else 'clear'})")
+    totals = {m: sum(results[m, n][0] for n, _, _ in frames) for m, _ in modes}
+    print("  inferences/frame: " + ", ".join(
+        f"{m} {totals[m] / len(frames):.1f}" for m, _ in modes)
+        + f" ({100 * (1 - totals['+skin'] / max(1, totals['fixed'])):.0f}% fewer)")
+    print(f"  verdict parity: {len(frames) - mismatches}/{len(frames)}")
+    return 0 if mismatches == 0 else 1
+
+
+# ---------------------------------------------------------------------------
+# multimon
+# ---------------------------------------------------------------------------
+
+def bench_multimon(args):
+    import guardian
+    from PIL import ImageDraw
+    frames = [img for _, img, _ in _synthetic_frames(args.displays)]
+    for i, img in enumerate(frames):
+        img.info["display"] = {"id": i + 1, "bounds": (i * 2560, 0, 2560, 1440)}
+
+    calls = []
+    real_scan_tile = guardian.scan_tile
+
+    def scan_tile(detector, name, tile, mon_idx):
+        calls.append((mon_idx, name))
+        if args.real:
+            return real_scan_tile(detector, name, tile, mon_idx)
+        time.sleep(args.infer_ms / 1000)      # stands in for one inference
+        return [], False, ""
+
+    guardian.scan_tile = scan_tile
+    if args.workers:
+        config = guardian.load_config()
+        guardian.load_config = lambda: dict(config, inference_workers=args.workers)
+    if args.real:
+        guardian.warm_detector(guardian.get_detector())
+    else:
+        guardian.get_detector = lambda: None
+
+    def run(label, fn):
+        calls.clear()
+        t = _time_runs(fn, args.runs)
+        per_run = len(calls) // args.runs
+        print(f"  {label:<34} {_fmt_ms(t)}  {per_run:>4} inferences")
+        return t
+
+    print(f"=== Layer V, {args.displays} displays "
+          f"({'real detector' if args.real else f'{args.infer_ms:.0f}ms simulated inference'}, "
+          f"{guardian.get_executor().cpu.stats()['workers']} inference workers, "
+          f"median of {args.runs}) ===")
+    t_seq = run("one display at a time", lambda: [guardian.layer_V([img]) for img in frames])
+    t_conc = run("all displays concurrently", lambda: guardian.layer_V(frames))
+
+    # Steady state: cursor on the last display, only that display changes
+    sched = guardian.DisplayScheduler(focus_point=lambda: (len(frames) * 2560 - 10, 10))
+    sched.mark_scanned(frames, sched.plan(frames))
+    changed = list(frames)
+    changed[-1] = frames[-1].copy()
+    ImageDraw.Draw(changed[-1]).rectangle((200, 200, 1200, 900), fill=(180, 120, 90))
+    order = sched.plan(changed)
+    t_sched = run(f"scheduled (scan {order})", lambda: guardian.layer_V(changed, order))
+    print(f"  speed-up: concurrent {t_seq / t_conc:.2f}x, scheduled {t_seq / t_sched:.2f}x")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# pyramid
+# ---------------------------------------------------------------------------
+
+def bench_pyramid(args):
+    import guardian
+    import numpy as np
+    from PIL import Image
+    try:
+        from nudenet.nudenet import _read_image     # the detector's own resize
+    except ImportError:
+        _read_image = None
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    frames = [img for _, img, _ in _synthetic_frames(3, size)]
+    w, h = size
+    boxes = [b for _, b in guardian.grid_boxes((0, 0, w, h), 3)]
+
+    def per_layer(img):
+        for box in boxes:                              # T1: crop + LANCZOS half per tile
+            tile = img.crop(box)
+            tile.resize((tile.width // 2, tile.height // 2), Image.LANCZOS)
+        img.reduce(max(1, max(size) // 384))           # prefilter thumbnail
+        img.resize((w // 8, h // 8), Image.NEAREST).convert("L")   # SR monitor
+        if _read_image:                                # full pass, detector downscale
+            _read_image(guardian._bgr(img), guardian.DETECT_SIDE)
+
+    def shared(img):
+        pyramid = guardian.FramePyramid(img)
+        for box in boxes:                              # T1: gray 1/2 views
+            np.ascontiguousarray(pyramid.view(box, 2, gray=True))
+        pyramid.level(8)                               # prefilter thumbnail
+        pyramid.level(1)[4::8, 4::8]                   # SR monitor
+        if _read_image:
+            full = (0, 0, w, h)
+            factor = pyramid.factor_for(full, guardian.DETECT_SIDE)
+            _read_image(guardian._bgr(pyramid.view(full, factor)), guardian.DETECT_SIDE)
+
+    print(f"=== Per-cycle resampling, {w}x{h} frames (median of {args.runs}) ===")
+    if not _read_image:
+        print("  (nudenet not installed — detector downscale not included)")
+    t_old = _time_runs(lambda: [per_layer(img) for img in frames], args.runs) / len(frames)
+    t_new = _time_runs(lambda: [shared(img) for img in frames], args.runs) / len(frames)
+    print(f"  {'each layer resamples':<28} {_fmt_ms(t_old)} / frame")
+    print(f"  {'shared FramePyramid':<28} {_fmt_ms(t_new)} / frame")
+    print(f"  resample time saved: {_fmt_ms(t_old - t_new)} / frame / display "
+          f"({100 * (1 - t_new / t_old):.0f}%)")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# textfilter
+# ---------------------------------------------------------------------------
+
+# (kind, has text): each frame is a 6x6 grid of cells of one kind, so every
+# 3x3 grid tile holds at least four whole cells. "one_word" is the sparse
+# case: a single dim word per grid tile on an otherwise blank display,
+# rendered at --sparse-size.
+_TEXT_KINDS = (("caption", True), ("title_below", True), ("overlay_small", True),
+               ("subtitle", True), ("page", True), ("photo", False), ("blank", False),
+               ("one_word", True))
+
+
+def _font(size: int, bold: bool = False):
+    from PIL import ImageFont
+    name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+    for path in (f"/usr/share/fonts/truetype/dejavu/{name}",
+                 "/System/Library/Fonts/Supplemental/Arial.ttf"):
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size=size)
+
+
+def _photo(rng, w: int, h: int):
+    """Smooth, slightly noisy colour field — no crisp edges of its own."""
+    import numpy as np
+    from PIL import Image, ImageFilter
+    yy, xx = np.mgrid[0:h, 0:w]
+    base = rng.integers(60, 200, 3)
+    px = (base + 40 * np.sin(xx / rng.uniform(40, 90))[..., None]
+          + 30 * np.cos(yy / rng.uniform(30, 70))[..., None] + rng.normal(0, 10, (h, w, 3)))
+    return Image.fromarray(np.clip(px, 0, 255).astype("uint8")).filter(ImageFilter.GaussianBlur(1.2))
+
+
+def _text_frame(kind: str, size=(2880, 1800), seed: int = 0):
+    """One synthetic Retina frame of the given kind (see _TEXT_KINDS)."""
+    import numpy as np
+    from PIL import Image, ImageDraw
+    rng = np.random.default_rng(seed)
+    w, h = size
+    cw, ch = w // 6, h // 6
+    img = Image.new("RGB", size, (24, 24, 24))
+    draw = ImageDraw.Draw(img)
+    for row in range(6):
+        for col in range(6):
+            x, y = col * cw, row * ch
+            if kind == "blank":
+                continue
+            if kind == "one_word":           # lone search-box word, one per grid tile
+                if row % 2 == 0 and col % 2 == 0:
+                    draw.text((x + cw // 2, y + ch // 2), "search", font=_font(24),
+                              fill=(140, 140, 140))
+                continue
+            if kind == "page":
+                for i in range(0, ch - 30, 30):
+                    draw.text((x + 10, y + 10 + i), "Terms and conditions apply",
+                              font=_font(22), fill=(20, 20, 20) if row % 2 else (220, 220, 200))
+                continue
+            if kind == "title_below":        # thumbnails with gutters and a title strip
+                img.paste(_photo(rng, cw - 8, ch - 60), (x + 4, y + 4))
+            else:                            # one continuous picture per cell
+                img.paste(_photo(rng, cw, ch), (x, y))
+            if kind == "caption":            # meme-style: bold, outlined, centred
+                draw.text((x + 20, y + ch // 2 - 30), "WHEN THE\nWEEKEND HITS",
+                          font=_font(34, bold=True), fill="white",
+                          stroke_width=3, stroke_fill="black")
+            elif kind == "title_below":      # video grid: title under each thumbnail
+                draw.text((x + 8, y + ch - 50), "Summer trip vlog, day 3",
+                          font=_font(24), fill=(230, 230, 230))
+            elif kind == "overlay_small":    # watermark-sized text straight on the photo
+                draw.text((x + 16, y + ch - 40), "@someone 12:04",
+                          font=_font(22), fill=(250, 250, 250))
+            elif kind == "subtitle":         # yellow subtitle over the lower third
+                draw.text((x + 20, y + ch - 70), "I told you already",
+                          font=_font(28), fill=(250, 230, 40))
+    return img
+
+
+def bench_textfilter(args):
+    import guardian
+    import numpy as np
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    if args.frames:
+        from PIL import Image
+        paths = sorted(p for p in Path(args.frames).expanduser().rglob("*")
+                       if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))
+        frames = [(p.stem, Image.open(p).convert("RGB"), None) for p in paths]
+    else:
+        sparse = tuple(int(v) for v in args.sparse_size.lower().split("x"))
+        frames = [(kind, _text_frame(kind, sparse if kind == "one_word" else size, i),
+                   has_text) for i, (kind, has_text) in enumerate(_TEXT_KINDS)]
+    if not frames:
+        print("no frames")
+        return 1
+    ocr = guardian.HAS_TESSERACT and args.ocr
+
+    print(f"=== Layer T1 text prefilter: >= {guardian.TEXT_EMPTY_PIXELS} crisp-edge pixels "
+          f"else empty, crisp >= {guardian.TEXT_CRISP_MIN} else image-only ===")
+    print(f"  {'frame':<24} {'pixels min..max':>15} {'crisp min..max':>16}"
+          f"  text/image/empty" + ("  OCR words in empty" if ocr else ""))
+    missed = 0
+    for name, img, has_text in frames:
+        pyramid = guardian.FramePyramid(img)
+        w, h = pyramid.size
+        tiles = [(tile_id, box, 2) for tile_id, box
+                 in guardian.grid_boxes((0, 0, w, h), 3)]
+        stats = [guardian.text_likelihood(pyramid.view(box, 2, gray=True))
+                 for _, box, _ in tiles]
+        text, image_only, empty = guardian.select_text_tiles(pyramid, tiles)
+        lost = ""
+        if ocr:
+            words = [len(guardian._ocr_tile(pyramid, box, 2)[0].split())
+                     for tile_id, box, _ in tiles if tile_id in empty]
+            lost = f"  {sum(words):>5}"
+            missed += sum(1 for n in words if n)
+        elif has_text:
+            missed += len(empty)
+        pixels = [st.pixels for st in stats]
+        crisp = [st.crisp for st in stats]
+        label = name if args.frames else f"{name} {img.width}x{img.height}"
+        print(f"  {label[:24]:<24} {min(pixels):>7}..{max(pixels):<7}"
+              f" {min(crisp):>7.2f}..{max(crisp):<7.2f}"
+              f"  {len(text):>4}/{len(image_only):>5}/{len(empty):>5}"
+              + ("" if has_text is None else f"  ({'text' if has_text else 'no text'})")
+              + lost)
+    if ocr or not args.frames:
+        source = "OCR found words" if ocr else "synthetic text"
+        print(f"  tiles skipped as empty where {source}: {missed}")
+    else:
+        print("  (pytesseract unavailable — empty tiles not checked for text)")
+    return 0 if missed == 0 else 1
+
+
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("startup", help="import-time profile and CLI wall time")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=12)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("tabs", help="tab enumeration cost vs tab count")
+    p.add_argument("--sizes", default="10,100,500,1000")
+    p.add_argument("--runs", type=int, default=7)
+    p.add_argument("--event-ms", type=float, default=0.0,
+                   help="simulated Apple Event latency per browser")
+    p.add_argument("--tab-event-us", type=float, default=0.0,
+                   help="simulated per-tab property read latency (legacy path)")
+    p.set_defaults(func=bench_tabs)
+
+    p = sub.add_parser("procs", help="Layer P process enumeration backends")
+    p.add_argument("--runs", type=int, default=50)
+    p.set_defaults(func=bench_procs)
+
+    p = sub.add_parser("replay", help="Layer V inference count and parity")
+    p.add_argument("--frames", default="",
+                   help="frame dir (positive/negative subdirs or labels.json)")
+    p.add_argument("--synthetic", type=int, default=6,
+                   help="synthetic desktop frames when --frames is not given")
+    p.set_defaults(func=bench_replay)
+
+    p = sub.add_parser("multimon", help="multi-display Layer V scheduling")
+    p.add_argument("--displays", type=int, default=3)
+    p.add_argument("--infer-ms", type=float, default=40.0,
+                   help="simulated per-inference latency")
+    p.add_argument("--real", action="store_true", help="use the real detector")
+    p.add_argument("--workers", type=int, default=0,
+                   help="inference workers (default: guardian's own sizing)")
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_multimon)
+
+    p = sub.add_parser("pyramid", help="per-cycle resampling, per layer vs shared")
+    p.add_argument("--size", default="2880x1800")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=bench_pyramid)
+
+    p = sub.add_parser("textfilter", help="T1 text prefilter on text-over-photo frames")
+    p.add_argument("--frames", default="",
+                   help="screenshot dir to measure instead of the synthetic frames")
+    p.add_argument("--size", default="2880x1800")
+    p.add_argument("--sparse-size", default="6016x3384",
+                   help="frame size for the one-word-per-tile case (default: 6K)")
+    p.add_argument("--no-ocr", dest="ocr", action="store_false",
+                   help="skip the Tesseract check of tiles classified empty")
+    p.set_defaults(func=bench_textfilter)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
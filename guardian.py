@@ -30,11 +30,15 @@ import secrets
 import hashlib
 import socket
 import threading
-import urllib.request
+import functools
+import contextlib
+import importlib.util
+from collections import deque, namedtuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
 EARLY_IMAGE_ONLY = "--image-only" in sys.argv[1:]
+_STARTED_AT = time.perf_counter()   # process start, for startup-latency reporting
 
 # ---------------------------------------------------------------------------
 # Version & Auto-Update
@@ -44,12 +48,8 @@ VERSION = "11"
 
 os.environ["PATH"] = "/opt/homebrew/bin:/usr/local/bin:" + os.environ.get("PATH", "")
 
-try:
-    import pytesseract
-    pytesseract.pytesseract.tesseract_cmd = "/opt/homebrew/bin/tesseract"
-    HAS_TESSERACT = True
-except ImportError:
-    HAS_TESSERACT = False
+# pytesseract (and the PIL it pulls in) is imported on first OCR — see get_tesseract()
+HAS_TESSERACT = importlib.util.find_spec("pytesseract") is not None
 
 # ---------------------------------------------------------------------------
 # Config
@@ -61,6 +61,34 @@ TRIGGER_THRESHOLD = 0.3
 COARSE_GRID = 5
 FINE_GRID = 3
 DETECTION_ANY = 0.1
+ADAPTIVE_TILING = True     # skip blank/uniform Layer V tiles (config: adaptive_tiling)
+TILE_EDGE_MIN = 0.004      # edge-pixel fraction below which a tile may be uniform
+TILE_STD_MIN = 4.0         # colour std below which a tile may be uniform
+SKIN_PREFILTER = True      # skip Layer V tiles with no skin tones (config: skin_prefilter)
+SKIN_MIN_FRACTION = 0.02   # config: skin_min_fraction
+COLORFUL_MIN = 30.0        # config: colorful_min — more colourful tiles are always scanned
+TONAL_MIN = 0.35           # config: tonal_min — photo-like grayscale tiles are always scanned
+DISPLAY_MAX_STALE = 30     # rescan an unchanged display at least this often (s)
+DISPLAY_SECONDARY_INTERVAL = 10  # non-focused displays: changed ones at most this often (s)
+ROI_SCANNING = True        # frontmost/media windows first (config: roi_scanning)
+ROI_BACKGROUND_EVERY = 3   # with ROIs, tile the rest of a display every Nth scan
+TEXT_PREFILTER = True      # skip empty grid tiles, OCR image-only ones last (config: text_prefilter)
+TEXT_EMPTY_PIXELS = 24     # crisp-edge pixels below which a tile holds no text
+TEXT_CRISP_MIN = 0.35      # crisp share of all edges below which a tile is image-only
+                           # (both measured by `guardian_bench.py textfilter`)
+OCR_CACHE_SIZE = 256       # OCR results kept by tile content hash (config: ocr_cache_size)
+EVIDENCE_GRID = 8          # evidence cells per display side
+EVIDENCE_DECAY = 0.5       # per-cycle multiplier on accumulated interest scores
+EVIDENCE_RESCAN = 0.2      # accumulated score that earns a targeted rescan
+EVIDENCE_MIN_CYCLES = 2    # ...once seen in at least this many cycles
+BURST_MODE = True          # multi-frame scan while video is frontmost (config: burst_mode)
+BURST_FRAMES = 6           # frames per burst (ring buffer size)
+BURST_FPS = 3.0
+BURST_BATCH = 3            # frames per batched detector pass
+BURST_SIDE = 640           # burst frames downscaled to this (detector input size)
+BURST_ESCALATE = 2         # frames with interest re-scanned by the full Layer V
+BURST_CPU_SHARE = 0.2      # long-run CPU (cores) bursts may use (config: burst_cpu_share)
+BURST_CPU_MAX = 2.0        # CPU seconds one burst may spend
 
 SCAN_ACTIVE = 5
 SCAN_IDLE = 30
@@ -71,22 +99,34 @@ IDLE_THRESHOLD_2 = 600
 IDLE_THRESHOLD_3 = 1800
 IMAGE_ONLY_MODE = EARLY_IMAGE_ONLY
 LOG_DIR = Path.home() / "Library" / "Logs" / "youareloved"
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "yal_incidents.log"
 RUNTIME_LOG = LOG_DIR / "guardian.log"
 RUNTIME_ERR = LOG_DIR / "guardian.error.log"
+METRICS_FILE = LOG_DIR / "metrics.json"
 
 MEMORY_FILE = Path.home() / ".yal_memory.json"
 CONFIG_FILE = Path.home() / ".yal_config.json"
 
 AUDIT_DIR = Path.home() / "youareloved" / "audit"
+AUDIT_INDEX = AUDIT_DIR / "index.json"
+# Defaults; each can be overridden in ~/.yal_config.json (same key, lowercase).
+AUDIT_FORMAT = "jpeg"          # png | jpeg | webp
+AUDIT_QUALITY = 85             # jpeg/webp quality
+AUDIT_MAX_SIDE = 2560          # full-screen image downscaled to this (0 = native)
+AUDIT_MAX_MB = 1024            # retention: total size of AUDIT_DIR
+AUDIT_MAX_DAYS = 30            # retention: incident age
+AUDIT_DEDUP_DISTANCE = 0       # dHash bits; images this close share one blob (0 = identical pixels only)
 GUARDIAN_PATH = Path.home() / "youareloved" / "guardian.py"
 PLIST_PATH = Path.home() / "Library" / "LaunchAgents" / "com.youareloved.guardian.plist"
 
 TEXT_LOG = Path.home() / "Desktop" / "yal_text.log"
 
 TMP_DIR = Path.home() / "Library" / "Caches" / "youareloved" / "tmp"
-TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+MODEL_DIR = Path.home() / "youareloved" / "models"
+MODEL_FP32 = MODEL_DIR / "640m.onnx"
+MODEL_INT8 = MODEL_DIR / "640m.int8.onnx"
+QUANT_MIN_AGREEMENT = 0.98   # INT8 vs FP32 trigger agreement required to enable
 
 # ---------------------------------------------------------------------------
 # NudeNet labels
@@ -104,9 +144,11 @@ NUDENET_INTEREST_LABELS = NUDENET_TRIGGER_LABELS | {
 }
 
 # ---------------------------------------------------------------------------
-# Safe URLs — structural only
+# URL classification — parse once, match hosts against domain-suffix tries
 # ---------------------------------------------------------------------------
 
+# Safe URLs — structural only. Entries with a scheme are URL prefixes
+# (browser-internal pages); bare entries are hosts, matched with subdomains.
 SAFE_URLS = {
     "chrome://newtab/", "chrome://new-tab-page/",
     "chrome://settings", "chrome://extensions", "chrome://history",
@@ -114,12 +156,93 @@ SAFE_URLS = {
     "claude.ai",
 }
 
+_SAFE_PREFIXES = tuple(sorted(u for u in SAFE_URLS if ":" in u))
+
+
+class DomainTrie:
+    """Reversed-label suffix trie: an entry "b.com" matches "b.com" and
+    "a.b.com" but not "ab.com" or "b.com.evil.net"."""
+
+    _END = ""   # labels are never empty, so "" marks a stored entry
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self._size = 0
+        for d in domains:
+            self.add(d)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, domain: str):
+        labels = [l for l in domain.lower().strip(".").split(".") if l]
+        if not labels:
+            return
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if self._END not in node:
+            self._size += 1
+        node[self._END] = domain
+
+    def match(self, host: str) -> str:
+        """Return the most specific stored entry covering host, or ""."""
+        node, found = self._root, ""
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(self._END, found)
+        return found
+
+
+_SAFE_HOSTS = DomainTrie(u for u in SAFE_URLS if ":" not in u)
+
+# Video-first sites: a frontmost tab here switches Layer V to burst mode
+VIDEO_HOSTS = DomainTrie({
+    "youtube.com", "youtu.be", "vimeo.com", "twitch.tv", "dailymotion.com",
+    "netflix.com", "hulu.com", "disneyplus.com", "primevideo.com", "max.com",
+    "tiktok.com", "rumble.com", "bilibili.com", "kick.com",
+})
+_VIDEO_PATH_RE = re.compile(r"/(watch|video|videos|embed|live|reel|reels|shorts)\b", re.I)
+
+
+# domain is host without "www."
+UrlInfo = namedtuple("UrlInfo", "url host domain safe")
+
+
+@functools.lru_cache(maxsize=4096)
+def classify_url(url: str) -> UrlInfo:
+    """Parse url once; cached per URL string for T2, T3 and memory."""
+    from urllib.parse import urlsplit
+    lower = url.lower().strip()
+    host = ""
+    if lower:
+        try:
+            host = urlsplit(lower if "://" in lower else f"https://{lower}").hostname or ""
+        except ValueError:
+            host = ""
+    domain = host[4:] if host.startswith("www.") else host
+    safe = lower.startswith(_SAFE_PREFIXES) or bool(host and _SAFE_HOSTS.match(host))
+    return UrlInfo(url, host, domain, safe)
+
+
+def is_video_url(url: str) -> bool:
+    """True for pages that are mostly video (known video host or video path)."""
+    if not url:
+        return False
+    from urllib.parse import urlsplit
+    host = classify_url(url).host
+    if host and VIDEO_HOSTS.match(host):
+        return True
+    try:
+        return bool(_VIDEO_PATH_RE.search(urlsplit(url).path))
+    except ValueError:
+        return False
+
+
 def is_safe_url(url: str) -> bool:
-    url_lower = url.lower().strip()
-    for safe in SAFE_URLS:
-        if safe in url_lower:
-            return True
-    return False
+    return classify_url(url).safe
 
 # ---------------------------------------------------------------------------
 # Text keyword tiers (from guardian_text v5)
@@ -182,14 +305,124 @@ AMBIGUOUS_PATTERNS = [
     r'\bgravure\b', r'\bgravure\s*idol\b', r'\bav\s*idol\b', r'\bidol\b', r'\bscrolller\b',
 ]
 
-_EXPLICIT_RE = [re.compile(p, re.IGNORECASE) for p in EXPLICIT_PATTERNS]
-_AMBIGUOUS_RE = [re.compile(p, re.IGNORECASE) for p in AMBIGUOUS_PATTERNS]
+# Compiled once on first use (not at import) so one-shot CLI paths stay fast;
+# preload_models() builds it on the daemon path.
+
+
+def _trie_regex(words) -> str:
+    """Regex source matching any of words, structured as a character trie so
+    the engine walks one automaton instead of trying each word in turn.
+    Optional tails are greedy, so the longest word at a position wins."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading literal text a \\b-anchored pattern must match, lowercased
+    ("" if the pattern isn't \\b-anchored or starts with a metachar)."""
+    if not pattern.startswith(r"\b"):
+        return ""
+    body, out, i = pattern[2:], [], 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\":
+            if i + 1 < len(body) and not body[i + 1].isalnum():
+                out.append(body[i + 1])
+                i += 2
+                continue
+            break
+        if c in ".*+?()[]{}|^$":
+            break
+        out.append(c)
+        i += 1
+    if i < len(body) and body[i] in "*?{" and out:
+        out.pop()          # last char is optional/repeated — not required
+    prefix = "".join(out).lower()
+    return prefix if re.fullmatch(r"\w+", prefix) else ""
+
+
+class NsfwMatcher:
+    """All NSFW text patterns, compiled once and shared by every text layer.
+
+    - explicit / ambiguous: the tier patterns, in priority order.
+    - A word-start trie automaton over every pattern's required literal
+      prefix. One pass over the text yields the only patterns that can
+      possibly match; the rest are skipped. Results are identical to
+      running every pattern, because a pattern cannot match without its
+      prefix appearing at a word start.
+    - A trie automaton over the plain terms (memory validation).
+    """
 
-ALL_NSFW_TERMS = set()
-for _p in EXPLICIT_PATTERNS + AMBIGUOUS_PATTERNS:
-    _clean = re.sub(r'\\b|\\s\*|\.\*|\[.*?\]|\(.*?\)', '', _p).strip()
-    if _clean:
-        ALL_NSFW_TERMS.add(_clean.lower())
+    def __init__(self):
+        self.explicit = [re.compile(p, re.IGNORECASE) for p in EXPLICIT_PATTERNS]
+        self.ambiguous = [re.compile(p, re.IGNORECASE) for p in AMBIGUOUS_PATTERNS]
+        prefixes = [_literal_prefix(p) for p in EXPLICIT_PATTERNS + AMBIGUOUS_PATTERNS]
+        self._explicit_prefix = prefixes[:len(EXPLICIT_PATTERNS)]
+        self._ambiguous_prefix = prefixes[len(EXPLICIT_PATTERNS):]
+        self._prefix_re = re.compile(r"\b" + _trie_regex({p for p in prefixes if p}))
+        self.terms = nsfw_terms()
+        self._terms_re = re.compile(_trie_regex(self.terms))
+
+    def prefixes_in(self, *texts) -> set:
+        """Every pattern prefix present at a word start in any of texts."""
+        found = set()
+        for text in texts:
+            for m in self._prefix_re.finditer(text):
+                word = m.group()
+                found.update(word[:n] for n in range(1, len(word) + 1))
+        return found
+
+    def candidates(self, patterns: list, prefixes: list, present: set):
+        """Yield patterns (in order) whose prefix is present or unknown."""
+        for pat, prefix in zip(patterns, prefixes):
+            if not prefix or prefix in present:
+                yield pat
+
+    def explicit_candidates(self, present: set):
+        return self.candidates(self.explicit, self._explicit_prefix, present)
+
+    def ambiguous_candidates(self, present: set):
+        return self.candidates(self.ambiguous, self._ambiguous_prefix, present)
+
+    def find_term(self, text: str) -> str:
+        """First plain NSFW term occurring anywhere in text (lowercased), or ""."""
+        m = self._terms_re.search(text)
+        return m.group() if m else ""
+
+
+@functools.lru_cache(maxsize=None)
+def nsfw_terms() -> frozenset:
+    """Plain lowercase terms derived from the tier patterns (memory validation)."""
+    terms = set()
+    for p in EXPLICIT_PATTERNS + AMBIGUOUS_PATTERNS:
+        clean = re.sub(r'\\b|\\s\*|\.\*|\[.*?\]|\(.*?\)', '', p).strip()
+        if clean:
+            terms.add(clean.lower())
+    return frozenset(terms)
+
+
+@functools.lru_cache(maxsize=None)
+def get_nsfw_matcher() -> NsfwMatcher:
+    return NsfwMatcher()
+
+
+@functools.lru_cache(maxsize=None)
+def nsfw_terms_fingerprint() -> str:
+    """Short hash of the term set; memory verdicts are only reused while it matches."""
+    return hashlib.sha256("\n".join(sorted(nsfw_terms())).encode()).hexdigest()[:12]
 
 # ---------------------------------------------------------------------------
 # Process names (Layer P)
@@ -243,11 +476,21 @@ log.setLevel(logging.DEBUG)
 log.propagate = False
 log.handlers.clear()
 
+log.addHandler(logging.NullHandler())   # real handlers: setup_logging()
+
 _fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 
-if EARLY_IMAGE_ONLY:
-    log.addHandler(logging.NullHandler())
-else:
+
+def setup_logging():
+    """Attach the runtime file/stdout handlers (daemon paths only).
+
+    Kept out of module import so one-shot CLI paths (--resolve-telegram,
+    --help) don't create log dirs or open log files.
+    """
+    if EARLY_IMAGE_ONLY or any(not isinstance(h, logging.NullHandler)
+                               for h in log.handlers):
+        return
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
     _fh = logging.FileHandler(str(RUNTIME_LOG))
     _fh.setLevel(logging.DEBUG)
     _fh.setFormatter(_fmt)
@@ -285,6 +528,193 @@ scan_count: int = 0
 # are suppressed until this unix timestamp.
 enforcement_until: float = 0.0
 
+# ---------------------------------------------------------------------------
+# Metrics (latency samples, summarised periodically)
+# ---------------------------------------------------------------------------
+
+_metrics_lock = threading.Lock()
+_metrics: dict = {}     # name -> recent samples (seconds)
+
+
+def metric_observe(name: str, seconds: float):
+    """Record one latency sample; the last 200 per metric are kept."""
+    with _metrics_lock:
+        _metrics.setdefault(name, deque(maxlen=200)).append(seconds)
+
+
+def metrics_summary() -> dict:
+    """{name: {n, p50_ms, p95_ms, max_ms}} over the retained samples."""
+    with _metrics_lock:
+        snapshot = {k: sorted(v) for k, v in _metrics.items() if v}
+    out = {}
+    for name, xs in snapshot.items():
+        out[name] = {"n": len(xs),
+                     "p50_ms": round(xs[len(xs) // 2] * 1000, 1),
+                     "p95_ms": round(xs[min(len(xs) - 1, int(len(xs) * 0.95))] * 1000, 1),
+                     "max_ms": round(xs[-1] * 1000, 1)}
+    return out
+
+
+def log_metrics():
+    """Log the summary and write it to METRICS_FILE (called every 100 scans)."""
+    summary = metrics_summary()
+    pools = _executor.stats() if _executor is not None else {}
+    if not summary and not pools:
+        return
+    for name, m in sorted(summary.items()):
+        log.info(f"  METRIC {name}: n={m['n']} p50={m['p50_ms']}ms "
+                 f"p95={m['p95_ms']}ms max={m['max_ms']}ms")
+    for name, p in pools.items():
+        log.info(f"  POOL {name}: {p['workers']} workers, {p['queued']} queued, "
+                 f"{p['active']} active, {p['utilization']:.0%} busy, "
+                 f"{p['completed']} done")
+    try:
+        METRICS_FILE.write_text(json.dumps(
+            {"updated": datetime.now().isoformat(), "metrics": summary,
+             "executors": pools}, indent=2))
+    except OSError as e:
+        log.debug(f"  Metrics write failed: {e}")
+
+# ---------------------------------------------------------------------------
+# Executor service (shared worker pools)
+# ---------------------------------------------------------------------------
+
+class WorkerPool:
+    """Persistent priority thread pool.
+
+    submit(priority, fn, *args) returns a concurrent.futures.Future; lower
+    priority values run first, FIFO within a priority. Callers cancel their
+    own queued futures with Future.cancel() — a worker skips cancelled
+    items when it dequeues them. stats() reports queue depth and the share
+    of worker time spent busy since the previous call.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        import itertools
+        import queue
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._busy = 0.0
+        self._active = 0
+        self._completed = 0
+        self._stats_at = time.monotonic()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True,
+                                          name=f"{name}-{i}")
+                         for i in range(max_workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, priority: int, fn, *args):
+        import concurrent.futures
+        if self._closed:
+            raise RuntimeError(f"{self.name} pool is shut down")
+        fut = concurrent.futures.Future()
+        self._queue.put((priority, next(self._seq), fut, fn, args))
+        return fut
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            busy, self._busy = self._busy, 0.0
+            elapsed, self._stats_at = now - self._stats_at, now
+            active, completed = self._active, self._completed
+        return {"workers": len(self._threads), "queued": self._queue.qsize(),
+                "active": active, "completed": completed,
+                "utilization": round(busy / max(1e-9, elapsed * len(self._threads)), 3)}
+
+    def shutdown(self, cancel_queued: bool = False, timeout: float = None):
+        """Stop the workers once the queue drains (or drop queued work first).
+        Waits up to timeout for them; returns True if all exited."""
+        import queue
+        self._closed = True
+        if cancel_queued:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[2] is not None:
+                    item[2].cancel()
+        for _ in self._threads:
+            self._queue.put((float("inf"), next(self._seq), None, None, ()))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in self._threads)
+
+    def _worker(self):
+        while True:
+            _, _, fut, fn, args = self._queue.get()
+            if fut is None:
+                return
+            if not fut.set_running_or_notify_cancel():
+                continue
+            t0 = time.perf_counter()
+            with self._lock:
+                self._active += 1
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._busy += time.perf_counter() - t0
+
+
+class ExecutorService:
+    """Guardian-wide pools: `cpu` for detector inference, `io` for alerts,
+    HTTP and audit writes — so a slow SMTP/Telegram call never holds an
+    inference slot, and nothing spawns a thread per event."""
+
+    def __init__(self, cpu_workers: int, io_workers: int):
+        self.cpu = WorkerPool("cpu", cpu_workers)
+        self.io = WorkerPool("io", io_workers)
+
+    def submit_io(self, fn, *args):
+        """Run fn(*args) on the I/O pool; exceptions are logged, not raised."""
+        def _run():
+            try:
+                return fn(*args)
+            except Exception as e:
+                log.error(f"Background task {getattr(fn, '__name__', fn)} failed: {e}")
+        return self.io.submit(0, _run)
+
+    def stats(self) -> dict:
+        return {"cpu": self.cpu.stats(), "io": self.io.stats()}
+
+    def shutdown(self, timeout: float = 10.0):
+        """Drop queued inference, let queued I/O (alerts, audits) finish."""
+        self.cpu.shutdown(cancel_queued=True, timeout=1.0)
+        if not self.io.shutdown(timeout=timeout):
+            log.warning("Executor: I/O work still running at shutdown")
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ExecutorService:
+    """The shared ExecutorService, sized from os.cpu_count() unless config sets
+    inference_workers / io_workers. Shut down automatically at exit."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                import atexit
+                cfg = load_config()
+                cpus = os.cpu_count() or 4
+                svc = ExecutorService(
+                    cpu_workers=int(cfg.get("inference_workers", max(2, min(8, cpus)))),
+                    io_workers=int(cfg.get("io_workers", 4)))
+                atexit.register(svc.shutdown)
+                _executor = svc
+    return _executor
+
 # ---------------------------------------------------------------------------
 # Idle Detection
 # ---------------------------------------------------------------------------
@@ -367,6 +797,7 @@ def fetch_server_partners() -> list:
 
     Updates local config on success. Falls back to local config silently.
     """
+    import urllib.request
     cfg = load_config()
     token = cfg.get("account_token", "")
     if not token:
@@ -407,13 +838,13 @@ def fetch_server_partners() -> list:
 
 
 def _partner_sync_loop():
-    """Background thread: re-fetch partners from server every 6 hours."""
+    """Background thread: fetch partners from server now, then every 6 hours."""
     while True:
-        time.sleep(_PARTNER_SYNC_INTERVAL)
         try:
             fetch_server_partners()
         except Exception as e:
             log.debug(f"  Partner sync loop error: {e}")
+        time.sleep(_PARTNER_SYNC_INTERVAL)
 
 
 def _fetch_telegram_chats_from_updates(tg_token: str, timeout_s: int = 10) -> dict:
@@ -422,6 +853,7 @@ def _fetch_telegram_chats_from_updates(tg_token: str, timeout_s: int = 10) -> di
     Note: Telegram bots can only discover a user's chat_id after the user has interacted
     with the bot (e.g. /start). getUpdates is the simplest polling mechanism.
     """
+    import urllib.request
     if not tg_token:
         return {}
     req = urllib.request.Request(
@@ -520,6 +952,7 @@ def hash_code(code: str) -> str:
 def _send_telegram(bot_token: str, chat_id: str, text: str,
                    photo_path: str = ""):
     """Send Telegram message (and optional photo) to a single chat_id."""
+    import urllib.request
     if not bot_token or not chat_id:
         return
     try:
@@ -562,6 +995,7 @@ def _send_telegram(bot_token: str, chat_id: str, text: str,
 
 def _send_email_alert(api_key: str, to_email: str, subject: str, body: str):
     """Send email via SendGrid to a single address."""
+    import urllib.request
     if not api_key or not to_email:
         return
     try:
@@ -668,9 +1102,8 @@ def fire_alerts(layer: str, detail: str, full_img=None):
                 except Exception as e:
                     log.error(f"  ALERT: Email failed for {email}: {e}")
 
-    # Fire in background thread — never block response
-    t = threading.Thread(target=_alert_worker, daemon=True)
-    t.start()
+    # Fire on the I/O pool — never block response
+    get_executor().submit_io(_alert_worker)
     log.info(f"  ALERTS: Firing to {len(partners)} partner(s) (background)")
 
 # ---------------------------------------------------------------------------
@@ -678,6 +1111,7 @@ def fire_alerts(layer: str, detail: str, full_img=None):
 # ---------------------------------------------------------------------------
 
 def first_run_setup():
+    import urllib.request
     cfg = load_config()
     if cfg.get("setup_complete"):
         return cfg
@@ -979,13 +1413,7 @@ def learn_url_from_claude(url: str):
     if not url or is_safe_url(url):
         return
     mem = load_memory()
-    domain = ""
-    try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url if "://" in url else f"https://{url}")
-        domain = parsed.netloc.lower().replace("www.", "")
-    except Exception:
-        pass
+    domain = classify_url(url).domain
     ts = datetime.now().isoformat()
     if url not in mem["urls"]:
         mem["urls"][url] = {"reason": "CLAUDE_CONFIRMED", "first_seen": ts, "count": 1}
@@ -1003,13 +1431,7 @@ def learn_url_visual(url: str):
     if not url or is_safe_url(url):
         return
     mem = load_memory()
-    domain = ""
-    try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url if "://" in url else f"https://{url}")
-        domain = parsed.netloc.lower().replace("www.", "")
-    except Exception:
-        pass
+    domain = classify_url(url).domain
     ts = datetime.now().isoformat()
     if url not in mem["urls"]:
         mem["urls"][url] = {"reason": "VISUAL_CONFIRMED", "first_seen": ts, "count": 1}
@@ -1022,74 +1444,476 @@ def learn_url_visual(url: str):
         mem["domains"][domain]["count"] += 1
     save_memory(mem)
 
+_memory_index_cache: tuple = (None, frozenset(), DomainTrie(), {"urls": {}, "domains": {}})
+
+
+def _memory_snapshot() -> tuple:
+    """(stamp, known_urls, domain_trie, mem) for MEMORY_FILE, re-parsed only
+    when the file changes (mtime/size)."""
+    global _memory_index_cache
+    try:
+        st = MEMORY_FILE.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    if stamp != _memory_index_cache[0] or stamp is None:
+        mem = load_memory()
+        _memory_index_cache = (stamp, frozenset(mem.get("urls", {})),
+                               DomainTrie(mem.get("domains", {})), mem)
+    return _memory_index_cache
+
+
+def memory_index() -> tuple:
+    """Return (known_urls, domain_trie) so Layer T3 needn't parse memory every cycle."""
+    return _memory_snapshot()[1:3]
+
+
+def _memory_entry(mem: dict, trie: DomainTrie, url: str, info: UrlInfo) -> tuple:
+    """(store, key, entry) for url — exact URL first, then its memorised domain
+    (looked up in trie, the snapshot's domain index)."""
+    if url in mem.get("urls", {}):
+        return "urls", url, mem["urls"][url]
+    if info.domain:
+        key = trie.match(info.domain)
+        if key in mem.get("domains", {}):
+            return "domains", key, mem["domains"][key]
+    return "", "", None
+
+
 def validate_memory_hit(url: str) -> bool:
-    if is_safe_url(url):
+    info = classify_url(url)
+    if info.safe:
         return False
-    mem = load_memory()
-    entry = mem.get("urls", {}).get(url)
-    if not entry:
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url.lower() if "://" in url.lower() else f"https://{url.lower()}")
-            domain = parsed.netloc.replace("www.", "")
-            entry = mem.get("domains", {}).get(domain)
-        except Exception:
-            pass
+    _, _, trie, mem = _memory_snapshot()
+    store, key, entry = _memory_entry(mem, trie, url, info)
     if not entry:
         return False
     reason = entry.get("reason", "")
     if reason not in ("CLAUDE_CONFIRMED", "VISUAL_CONFIRMED"):
         _purge_memory_entry(url)
         return False
-    url_lower = url.lower().replace(".", "")
-    if not any(t in url_lower for t in ALL_NSFW_TERMS):
+    # A verdict is reused only for the same URL against the same term set.
+    verdict = {"terms": nsfw_terms_fingerprint(), "url": url}
+    if entry.get("verdict") == verdict:
+        return True
+    term = get_nsfw_matcher().find_term(url.lower().replace(".", ""))
+    if not term:
         _purge_memory_entry(url)
         return False
+    fresh = load_memory()
+    if key in fresh.get(store, {}):
+        fresh[store][key]["verdict"] = verdict
+        save_memory(fresh)
     return True
 
 def _purge_memory_entry(url: str):
     mem = load_memory()
     if url in mem.get("urls", {}):
         del mem["urls"][url]
-    try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url.lower() if "://" in url.lower() else f"https://{url.lower()}")
-        domain = parsed.netloc.replace("www.", "")
-        if domain in mem.get("domains", {}):
-            del mem["domains"][domain]
-    except Exception:
-        pass
+    domain = classify_url(url).domain
+    key = _memory_snapshot()[2].match(domain) if domain else ""
+    if key in mem.get("domains", {}):
+        del mem["domains"][key]
     save_memory(mem)
 
 # ---------------------------------------------------------------------------
-# Audit (from guardian.py v8.1)
+# Audit (from guardian.py v8.1) — background writer, blob store, retention
 # ---------------------------------------------------------------------------
 
+_AUDIT_EXT = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+_AUDIT_IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def _audit_settings() -> dict:
+    cfg = load_config()
+    fmt = str(cfg.get("audit_format", AUDIT_FORMAT)).lower()
+    return {
+        "format": fmt if fmt in _AUDIT_EXT else AUDIT_FORMAT,
+        "quality": int(cfg.get("audit_quality", AUDIT_QUALITY)),
+        "max_side": int(cfg.get("audit_max_side", AUDIT_MAX_SIDE)),
+        "max_bytes": int(float(cfg.get("audit_max_mb", AUDIT_MAX_MB)) * 1_048_576),
+        "max_days": float(cfg.get("audit_max_days", AUDIT_MAX_DAYS)),
+        "dedup_distance": int(cfg.get("audit_dedup_distance", AUDIT_DEDUP_DISTANCE)),
+    }
+
+
+def _fit(img, max_side: int):
+    if max_side and max(img.size) > max_side:
+        scale = max_side / max(img.size)
+        img = img.resize((max(1, int(img.size[0] * scale)),
+                          max(1, int(img.size[1] * scale))))
+    return img
+
+
+def _encode_image(img, path_stem: Path, fmt: str, quality: int) -> Path:
+    """Write img as fmt next to path_stem (falls back to PNG); returns the path."""
+    if fmt != "png" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    path = path_stem.with_suffix("." + _AUDIT_EXT[fmt])
+    try:
+        if fmt == "png":
+            img.save(str(path), format="PNG")
+        else:
+            img.save(str(path), format=fmt.upper(), quality=quality)
+    except (KeyError, OSError) as e:       # e.g. Pillow built without WebP
+        if fmt == "png":
+            raise
+        log.debug(f"  Audit: {fmt} encode failed ({e}) — using PNG")
+        return _encode_image(img, path_stem, "png", quality)
+    return path
+
+
+def dhash(img) -> str:
+    """64-bit difference hash (16 hex chars): one bit per horizontal gradient
+    sign on a 9x8 grayscale thumbnail. Near-identical screens differ by a few bits."""
+    from PIL import Image
+    px = list(img.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def content_hash(img) -> str:
+    """Blob key: 128-bit BLAKE2b of mode, size and raw pixels."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def _hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class AuditStore:
+    """Incident persistence off the scan thread.
+
+    save() only enqueues the incident on the shared I/O pool.
+    Images live once in a content-addressed blob store (root/blobs/ab/<hash>)
+    keyed by content_hash: an identical image is not encoded or written
+    again, it just takes another reference. With dedup_distance > 0, an image
+    whose dHash is within that many bits of a same-size blob is also folded
+    onto it. incident.json names its images by hash.
+
+    AUDIT_INDEX (incidents oldest first, blobs with refcounts and sizes) is
+    the source of truth for counting, listing and the size/age quota, which
+    is enforced after every write by dropping the oldest incidents and any
+    blobs they leave unreferenced. It is rebuilt from a scan only if missing
+    or unreadable. The daemon and `--migrate-audit` may both hold a store:
+    every index read-modify-write takes an flock on <index>.lock, and the
+    cached index is reloaded whenever the file changed underneath it.
+    """
+
+    def __init__(self, root: Path = AUDIT_DIR, index_path: Path = AUDIT_INDEX):
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = None
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    # -- index ---------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """This store's thread lock plus an exclusive flock shared with other
+        processes using the same index."""
+        import fcntl
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.index_path.with_suffix(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _load_index(self) -> dict:
+        """The index, re-read if another process rewrote it (call under _locked)."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._index is None or mtime != self._index_mtime:
+            try:
+                self._index = json.loads(self.index_path.read_text())
+                self._index.setdefault("blobs", {})
+                self._index_mtime = mtime
+            except (OSError, ValueError):
+                self._index = self._rebuild_index()
+                self._save_index()
+        return self._index
+
+    def _rebuild_index(self) -> dict:
+        incidents, blobs = [], {}
+        for d in sorted(self.root.glob("incident_*")):
+            if not d.is_dir():
+                continue
+            try:
+                meta = json.loads((d / "incident.json").read_text())
+            except (OSError, ValueError):
+                meta = {}
+            refs = []
+            for img in meta.get("images", {}).values():
+                h = img["blob"]
+                blob = self._blob_path(h)
+                if blob is None:
+                    continue
+                entry = blobs.setdefault(h, {"file": str(blob.relative_to(self.root)),
+                                             "bytes": blob.stat().st_size, "refs": 0,
+                                             "size": img.get("size"),
+                                             "dhash": img.get("dhash")})
+                entry["refs"] += 1
+                refs.append(h)
+            ts = meta.get("timestamp") or datetime.fromtimestamp(d.stat().st_mtime).isoformat()
+            incidents.append({"dir": d.name, "timestamp": ts,
+                              "detail": meta.get("trigger_detail", ""),
+                              "bytes": _dir_bytes(d), "blobs": refs})
+        incidents.sort(key=lambda e: e["timestamp"])
+        index = {"incidents": incidents, "blobs": blobs}
+        self._recount(index)
+        return index
+
+    def _blob_path(self, h: str):
+        return next(iter((self.blob_dir / h[:2]).glob(h + ".*")), None)
+
+    @staticmethod
+    def _recount(index: dict):
+        index["total_bytes"] = (sum(e["bytes"] for e in index["incidents"])
+                                + sum(b["bytes"] for b in index["blobs"].values()))
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, indent=1))
+        os.replace(tmp, self.index_path)
+        self._index_mtime = self.index_path.stat().st_mtime_ns
+
+    def count(self) -> int:
+        with self._locked():
+            return len(self._load_index()["incidents"])
+
+    def incidents(self) -> list:
+        """Index entries, oldest first."""
+        with self._locked():
+            return list(self._load_index()["incidents"])
+
+    # -- blobs ---------------------------------------------------------------
+
+    def _store_blob(self, index: dict, img, fmt: str, quality: int,
+                    distance: int, path: Path = None) -> tuple:
+        """Add img (or an already-encoded file at path) to the blob store.
+
+        Returns (hash, new) — new is False when an identical (or, with
+        distance > 0, near-identical same-size) blob existed and was
+        referenced instead. An existing blob file is never overwritten."""
+        h, dh = content_hash(img), dhash(img)
+        size = list(img.size)
+        blobs = index["blobs"]
+        match = h if h in blobs else None
+        if match is None and distance > 0:
+            match = next((k for k, b in blobs.items()
+                          if b.get("size") == size and b.get("dhash")
+                          and _hamming(b["dhash"], dh) <= distance), None)
+        if match is not None:
+            blobs[match]["refs"] += 1
+            if path is not None:
+                path.unlink()
+            return match, False
+        dest = self._blob_path(h)
+        if dest is not None:
+            # Same content already on disk but missing from the index.
+            if path is not None:
+                path.unlink()
+        else:
+            (self.blob_dir / h[:2]).mkdir(parents=True, exist_ok=True)
+            stem = self.blob_dir / h[:2] / h
+            if path is None:
+                dest = _encode_image(img, stem, fmt, quality)
+            else:
+                dest = stem.with_suffix(path.suffix.lower())
+                os.replace(path, dest)
+        blobs[h] = {"file": str(dest.relative_to(self.root)), "bytes": dest.stat().st_size,
+                    "refs": 1, "size": size, "dhash": dh}
+        return h, True
+
+    def _release_blobs(self, index: dict, hashes: list):
+        for h in hashes:
+            blob = index["blobs"].get(h)
+            if blob is None:
+                continue
+            blob["refs"] -= 1
+            if blob["refs"] <= 0:
+                try:
+                    (self.root / blob["file"]).unlink()
+                except OSError:
+                    pass
+                del index["blobs"][h]
+
+    # -- writing -------------------------------------------------------------
+
+    def save(self, **incident):
+        fut = get_executor().submit_io(self._run, incident)
+        with self._pending_lock:
+            self._pending.add(fut)
+        fut.add_done_callback(self._done)
+
+    def _done(self, fut):
+        with self._pending_lock:
+            self._pending.discard(fut)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until queued incidents are written (tests, shutdown)."""
+        import concurrent.futures
+        with self._pending_lock:
+            pending = list(self._pending)
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        return not not_done
+
+    def _run(self, incident: dict):
+        t0 = time.perf_counter()
+        try:
+            self._write(**incident)
+        except Exception as e:
+            log.error(f"AUDIT: write failed: {e}")
+            return
+        metric_observe("audit_write", time.perf_counter() - t0)
+
+    def _write(self, ts: datetime, mon_idx: int, tile_name: str, results: list,
+               full_img, tile_img, url: str, detail: str):
+        opts = _audit_settings()
+        incident_dir = self.root / f"incident_{ts.strftime('%Y%m%d_%H%M%S')}"
+        incident_dir.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            index = self._load_index()
+            images, written = {}, 0
+            for role, img in (("full", _fit(full_img, opts["max_side"])), ("tile", tile_img)):
+                h, new = self._store_blob(index, img, opts["format"], opts["quality"],
+                                          opts["dedup_distance"])
+                images[role] = {"blob": h, "file": index["blobs"][h]["file"],
+                                "size": list(img.size), "dhash": index["blobs"][h].get("dhash")}
+                written += index["blobs"][h]["bytes"] if new else 0
+            meta = {
+                "timestamp": ts.isoformat(), "monitor": mon_idx,
+                "tile": tile_name, "tile_size": list(tile_img.size),
+                "images": images,
+                "threshold": TRIGGER_THRESHOLD,
+                "detections": [{"class": d.get("class", ""),
+                                "score": round(d.get("score", 0), 4)} for d in results],
+                "trigger_detail": detail, "active_url": url,
+            }
+            (incident_dir / "incident.json").write_text(json.dumps(meta, indent=2))
+            replaced = [e for e in index["incidents"] if e["dir"] == incident_dir.name]
+            for e in replaced:
+                self._release_blobs(index, e.get("blobs", []))
+            index["incidents"] = [e for e in index["incidents"] if e["dir"] != incident_dir.name]
+            index["incidents"].append({"dir": incident_dir.name, "timestamp": meta["timestamp"],
+                                       "detail": detail, "bytes": _dir_bytes(incident_dir),
+                                       "blobs": [i["blob"] for i in images.values()]})
+            self._recount(index)
+            removed = self._enforce_quota(index, opts["max_bytes"], opts["max_days"],
+                                          keep=incident_dir.name)
+            self._save_index()
+        log.info(f"AUDIT: Saved to {incident_dir} ({written / 1024:.0f} KB new"
+                 + (", deduplicated" if written == 0 else "")
+                 + (f", pruned {removed} old" if removed else "") + ")")
+
+    def _enforce_quota(self, index: dict, max_bytes: int, max_days: float, keep: str) -> int:
+        """Drop oldest incidents until size and age limits hold (never `keep`)."""
+        import shutil
+        cutoff = (datetime.now() - timedelta(days=max_days)).isoformat()
+        removed = 0
+        incidents = index["incidents"]
+        while incidents and incidents[0]["dir"] != keep and (
+                index["total_bytes"] > max_bytes or incidents[0]["timestamp"] < cutoff):
+            oldest = incidents.pop(0)
+            shutil.rmtree(self.root / oldest["dir"], ignore_errors=True)
+            self._release_blobs(index, oldest.get("blobs", []))
+            self._recount(index)
+            removed += 1
+        return removed
+
+    # -- migration -----------------------------------------------------------
+
+    def migrate(self) -> dict:
+        """Move images from legacy incident_* directories into the blob store.
+
+        Files keep their encoding; duplicates collapse onto one blob.
+        Idempotent — incidents already referencing blobs are skipped."""
+        from PIL import Image
+        opts = _audit_settings()
+        report = {"incidents": 0, "images": 0, "blobs_new": 0, "deduplicated": 0,
+                  "bytes_before": 0, "bytes_after": 0}
+        with self._locked():
+            self._index = self._rebuild_index()
+            report["bytes_before"] = self._index["total_bytes"]
+            for d in sorted(self.root.glob("incident_*")):
+                meta_path = d / "incident.json"
+                try:
+                    meta = json.loads(meta_path.read_text())
+                except (OSError, ValueError):
+                    continue
+                if meta.get("images"):
+                    continue
+                images = {}
+                for f in sorted(d.iterdir()):
+                    if f.suffix.lower() not in _AUDIT_IMAGE_EXTS:
+                        continue
+                    role = "full" if "_full" in f.stem else "tile"
+                    with Image.open(f) as img:
+                        img.load()
+                        h, new = self._store_blob(self._index, img, opts["format"],
+                                                  opts["quality"], opts["dedup_distance"],
+                                                  path=f)
+                        size = list(img.size)
+                    images[role if role not in images else f.stem] = {
+                        "blob": h, "file": self._index["blobs"][h]["file"], "size": size,
+                        "dhash": self._index["blobs"][h].get("dhash")}
+                    report["images"] += 1
+                    report["blobs_new" if new else "deduplicated"] += 1
+                if not images:
+                    continue
+                meta["images"] = images
+                meta_path.write_text(json.dumps(meta, indent=2))
+                report["incidents"] += 1
+            self._index = self._rebuild_index()
+            self._save_index()
+            report["bytes_after"] = self._index["total_bytes"]
+        return report
+
+
+_audit_store = None
+
+
+def get_audit_store() -> AuditStore:
+    global _audit_store
+    if _audit_store is None:
+        _audit_store = AuditStore()
+    return _audit_store
+
+
 def save_audit(mon_idx: int, tile_name: str, results: list,
                full_img, tile_img, url: str, detail: str):
-    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now()
-    ts_str = ts.strftime("%Y%m%d_%H%M%S")
-    incident_dir = AUDIT_DIR / f"incident_{ts_str}"
-    incident_dir.mkdir(exist_ok=True)
-    full_img.save(str(incident_dir / f"monitor_{mon_idx}_full.png"))
-    tile_img.save(str(incident_dir / f"monitor_{mon_idx}_tile_{tile_name}.png"))
-    meta = {
-        "timestamp": ts.isoformat(), "monitor": mon_idx,
-        "tile": tile_name, "tile_size": list(tile_img.size),
-        "threshold": TRIGGER_THRESHOLD,
-        "detections": [{"class": d.get("class", ""),
-                        "score": round(d.get("score", 0), 4)} for d in results],
-        "trigger_detail": detail, "active_url": url,
-    }
-    (incident_dir / "incident.json").write_text(json.dumps(meta, indent=2))
-    log.info(f"AUDIT: Saved to {incident_dir}")
+    """Queue an incident for the audit writer (returns immediately). Images
+    may be PIL or RGB ndarray tiles (FramePyramid views)."""
+    get_audit_store().save(ts=datetime.now(), mon_idx=mon_idx, tile_name=tile_name,
+                           results=list(results), full_img=to_pil(full_img),
+                           tile_img=to_pil(tile_img), url=url, detail=detail)
 
 # ---------------------------------------------------------------------------
 # Lazy deps
 # ---------------------------------------------------------------------------
 
 _detector = None
+_detector_lock = threading.Lock()   # preload thread and layer_V may race on first load
 _mss = None
 
 # Label list fixed by the NudeNet 640m model (18 classes, order matches ONNX output)
@@ -1166,31 +1990,78 @@ def _patch_nudenet_threshold():
     log.debug(f"  NudeNet _postprocess patched: threshold={_thresh:.2f} (was 0.25)")
 
 
+def _quantized_model_enabled() -> bool:
+    """True when config selects the INT8 model AND it passed the accuracy gate."""
+    cfg = load_config()
+    if cfg.get("detector_model", "fp32") != "int8":
+        return False
+    if not cfg.get("detector_quant_gate", {}).get("passed"):
+        log.warning("detector_model=int8 but accuracy gate has not passed — using FP32")
+        return False
+    if not MODEL_INT8.exists():
+        log.warning(f"detector_model=int8 but {MODEL_INT8} missing — using FP32")
+        return False
+    return True
+
+
 def get_detector():
     global _detector
-    if _detector is None:
-        from nudenet import NudeDetector
-        # Use 640m model from our models directory (downloaded during install)
-        model_path = Path.home() / "youareloved" / "models" / "640m.onnx"
-        if model_path.exists():
-            _detector = NudeDetector(
-                model_path=str(model_path),
+    if _detector is not None:
+        return _detector
+    with _detector_lock:
+        if _detector is None:
+            _load_detector()
+    return _detector
+
+
+def _load_detector():
+    """Build the detector and patch NudeNet before publishing it to _detector."""
+    global _detector
+    from nudenet import NudeDetector
+    # Use 640m model from our models directory (downloaded during install)
+    model_path = MODEL_FP32
+    if _quantized_model_enabled():
+        det = NudeDetector(
+            model_path=str(MODEL_INT8),
+            inference_resolution=640)
+        log.info("NudeNet 640m INT8 model loaded (quantized)")
+    elif model_path.exists():
+        det = NudeDetector(
+            model_path=str(model_path),
+            inference_resolution=640)
+        log.info("NudeNet 640m model loaded (high-res)")
+    else:
+        # Fallback: check ~/.NudeNet
+        alt_path = Path.home() / ".NudeNet" / "640m.onnx"
+        if alt_path.exists():
+            det = NudeDetector(
+                model_path=str(alt_path),
                 inference_resolution=640)
-            log.info("NudeNet 640m model loaded (high-res)")
+            log.info("NudeNet 640m model loaded from ~/.NudeNet")
         else:
-            # Fallback: check ~/.NudeNet
-            alt_path = Path.home() / ".NudeNet" / "640m.onnx"
-            if alt_path.exists():
-                _detector = NudeDetector(
-                    model_path=str(alt_path),
-                    inference_resolution=640)
-                log.info("NudeNet 640m model loaded from ~/.NudeNet")
-            else:
-                log.warning("640m model not found — using default 320n (lower quality)")
-                _detector = NudeDetector()
-                log.info("NudeNet 320n model loaded")
-        _patch_nudenet_threshold()   # lower NMS floor from 0.25 → DETECTION_ANY
-    return _detector
+            log.warning("640m model not found — using default 320n (lower quality)")
+            det = NudeDetector()
+            log.info("NudeNet 320n model loaded")
+    _patch_nudenet_threshold()   # lower NMS floor from 0.25 → DETECTION_ANY
+    _detector = det
+
+
+def warm_detector(detector):
+    """Run one dummy inference so ONNX Runtime allocates and optimises the graph."""
+    import numpy as np
+    detector.detect(np.zeros((640, 640, 3), dtype=np.uint8))
+
+_tesseract = None
+
+
+def get_tesseract():
+    """Import pytesseract on first OCR (it pulls in PIL and packaging)."""
+    global _tesseract
+    if _tesseract is None:
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = "/opt/homebrew/bin/tesseract"
+        _tesseract = pytesseract
+    return _tesseract
 
 def get_mss():
     global _mss
@@ -1217,6 +2088,59 @@ def _console_uid() -> str:
     return ""
 
 
+def _cgimage_to_pil(cg_img):
+    """RGB PIL image of an 8-bit BGRA CGImage, or None if it is missing,
+    empty, HDR (16 bpc — the caller falls through to another method) or
+    solid black."""
+    import Quartz
+    from PIL import Image
+    if cg_img is None:
+        return None
+    w = Quartz.CGImageGetWidth(cg_img)
+    h = Quartz.CGImageGetHeight(cg_img)
+    bpr = Quartz.CGImageGetBytesPerRow(cg_img)
+    bpc = Quartz.CGImageGetBitsPerComponent(cg_img)
+    if w == 0 or h == 0:
+        return None
+    if bpc != 8:
+        log.debug(f"  CGImage: skipping {bpc}bpc image")
+        return None
+    data = bytes(Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_img)))
+    if len(data) < bpr * h:
+        return None
+    img = Image.frombuffer("RGBA", (w, h), data, "raw", "BGRA", bpr, 1).convert("RGB")
+    return img if img.convert("L").getextrema() != (0, 0) else None
+
+
+def capture_rect(display: dict, rect: tuple):
+    """Capture only rect (x, y, w, h in global points) of one display, as
+    recorded in a frame's img.info["display"], or None.
+
+    Quartz displays use CGDisplayCreateImageForRect (the framebuffer path of
+    capture_screenshots' Method 0); mss displays grab just the rect.
+    """
+    x, y, w, h = rect
+    if w <= 0 or h <= 0:
+        return None
+    if isinstance(display["id"], int):
+        try:
+            import Quartz
+            dx, dy = display["bounds"][:2]
+            return _cgimage_to_pil(Quartz.CGDisplayCreateImageForRect(
+                display["id"], Quartz.CGRectMake(x - dx, y - dy, w, h)))
+        except Exception as e:
+            log.debug(f"  CGDisplayCreateImageForRect failed: {e}")
+            return None
+    try:
+        from PIL import Image
+        raw = get_mss().grab({"left": int(x), "top": int(y),
+                              "width": int(w), "height": int(h)})
+        return Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
+    except Exception as e:
+        log.debug(f"  mss rect grab failed: {e}")
+        return None
+
+
 def capture_screenshots() -> list:
     """Capture screen using multiple methods until one works.
 
@@ -1255,27 +2179,12 @@ def capture_screenshots() -> list:
         if err == 0 and count > 0:
             images_m0 = []
             for display_id in list(display_ids)[:count]:
-                cg_img = Quartz.CGDisplayCreateImage(display_id)
-                if cg_img is None:
-                    continue
-                w = Quartz.CGImageGetWidth(cg_img)
-                h = Quartz.CGImageGetHeight(cg_img)
-                bpr = Quartz.CGImageGetBytesPerRow(cg_img)
-                bpc = Quartz.CGImageGetBitsPerComponent(cg_img)
-                if w == 0 or h == 0:
-                    continue
-                if bpc != 8:
-                    # 16-bit HDR display — fall through to next method
-                    log.debug(f"  CGDisplayCreateImage: skipping {bpc}bpc display {display_id}")
-                    continue
-                data = bytes(Quartz.CGDataProviderCopyData(
-                    Quartz.CGImageGetDataProvider(cg_img)))
-                if len(data) < bpr * h:
-                    continue
-                img = Image.frombuffer(
-                    "RGBA", (w, h), data, "raw", "BGRA", bpr, 1).convert("RGB")
-                extrema = img.convert("L").getextrema()
-                if extrema != (0, 0):
+                img = _cgimage_to_pil(Quartz.CGDisplayCreateImage(display_id))
+                if img is not None:
+                    b = Quartz.CGDisplayBounds(display_id)
+                    img.info["display"] = {
+                        "id": int(display_id),
+                        "bounds": (b.origin.x, b.origin.y, b.size.width, b.size.height)}
                     images_m0.append(img)
             if images_m0:
                 log.debug(f"  Capture: CGDisplayCreateImage ({len(images_m0)} display(s))")
@@ -1358,6 +2267,9 @@ def capture_screenshots() -> list:
             img = Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
             extrema = img.convert("L").getextrema()
             if extrema != (0, 0):
+                img.info["display"] = {
+                    "id": f"mss{len(images)}",
+                    "bounds": (mon["left"], mon["top"], mon["width"], mon["height"])}
                 images.append(img)
         if images:
             log.debug("  Capture: mss")
@@ -1374,118 +2286,825 @@ def capture_screenshots() -> list:
     )
 
 # ---------------------------------------------------------------------------
-# AppleScript
+# Shared frame store — latest scan_cycle capture, reused by background checks
 # ---------------------------------------------------------------------------
 
-def _osascript(script: str) -> str:
-    try:
-        r = subprocess.run(["osascript", "-e", script],
-                           capture_output=True, text=True, timeout=5)
-        return r.stdout.strip()
-    except Exception:
-        return ""
-
-def get_active_url() -> str:
-    url = _osascript('''
-tell application "System Events"
-    if exists (process "Google Chrome") then
-        tell application "Google Chrome"
-            try
-                return URL of active tab of front window
-            end try
-        end tell
-    end if
-end tell
-''')
-    if url:
-        return url
-    return _osascript('''
-tell application "System Events"
-    if exists (process "Safari") then
-        tell application "Safari"
-            try
-                return URL of current tab of front window
-            end try
-        end tell
-    end if
-end tell
-''') or ""
+_frames_lock = threading.Lock()
+_latest_frames: list = []
+_latest_pyramids: list = []     # FramePyramid per published frame — the cycle's frame cache
+_latest_frames_at: float = 0.0
+
+
+def publish_frames(images: list):
+    """Record the frames scan_cycle just captured (monotonic timestamp) and
+    start a fresh frame cache for them."""
+    global _latest_frames, _latest_pyramids, _latest_frames_at
+    with _frames_lock:
+        _latest_frames = list(images)
+        _latest_pyramids = [FramePyramid(img) for img in images]
+        _latest_frames_at = time.monotonic()
+
+
+def frame_pyramid(img) -> "FramePyramid":
+    """The cycle's cached FramePyramid for a published frame, so T1, V and
+    the SR monitor share one set of resampled levels; a new one otherwise."""
+    with _frames_lock:
+        for pyramid in _latest_pyramids:
+            if pyramid.image is img:
+                return pyramid
+    return FramePyramid(img)
+
+
+def recent_frames(max_age: float) -> list:
+    """Return the last published frames if younger than max_age seconds, else []."""
+    with _frames_lock:
+        if _latest_frames and time.monotonic() - _latest_frames_at <= max_age:
+            return list(_latest_frames)
+    return []
 
 # ---------------------------------------------------------------------------
-# Text scanning helper
+# Window geometry — frontmost and media windows as scan regions
 # ---------------------------------------------------------------------------
 
-def scan_text_tiers(text: str, source_id: str, url: str = "") -> tuple:
-    text_lower = text.lower()
-    text_nodots = text_lower.replace(".", "")
-    for pat in _EXPLICIT_RE:
-        m = pat.search(text_lower) or pat.search(text_nodots)
-        if m:
-            return True, f"explicit='{m.group()}' source={source_id}", []
-    ambiguous = []
-    seen = set()
-    for pat in _AMBIGUOUS_RE:
-        m = pat.search(text_lower)
-        if m and m.group() not in seen:
-            seen.add(m.group())
-            idx = m.start()
-            start = max(0, idx - 150)
-            end = min(len(text), idx + len(m.group()) + 150)
-            context = text[start:end].strip()
-            ambiguous.append((source_id, m.group(), context, url))
-    return False, "", ambiguous
+MEDIA_APPS = {
+    "VLC", "IINA", "QuickTime Player", "Infuse", "mpv",
+    "Elmedia Player", "Movist", "Movist Pro", "Photos", "TV",
+}
 
-# ---------------------------------------------------------------------------
-# Tiling (from guardian.py v8.1)
-# ---------------------------------------------------------------------------
+# bounds: (x, y, w, h) in global points, like CGDisplayBounds
+WindowInfo = namedtuple("WindowInfo", "owner bounds frontmost media")
+Regions = namedtuple("Regions", "rois background")
 
-def make_grid(img, n: int, prefix: str = "g", n_cols: int = None) -> list:
-    n_cols = n_cols if n_cols is not None else n
-    w, h = img.size
-    tw, th = w // n_cols, h // n
-    tiles = []
-    for row in range(n):
-        for col in range(n_cols):
-            x1 = col * tw
-            y1 = row * th
-            x2 = x1 + tw if col < n_cols - 1 else w
-            y2 = y1 + th if row < n - 1 else h
-            tiles.append((f"{prefix}{row}{col}", img.crop((x1, y1, x2, y2)),
-                          (x1, y1, x2, y2)))
-    return tiles
 
-def make_overlaps(img, n: int, n_cols: int = None) -> list:
-    n_cols = n_cols if n_cols is not None else n
-    w, h = img.size
-    tw, th = w // n_cols, h // n
-    ox, oy = tw // 2, th // 2
-    tiles = []
-    for row in range(n - 1):
-        for col in range(n_cols - 1):
-            x1 = max(0, col * tw + ox)
-            y1 = max(0, row * th + oy)
-            x2 = min(w, x1 + tw)
-            y2 = min(h, y1 + th)
-            if x2 - x1 > 50 and y2 - y1 > 50:
-                tiles.append((f"o{row}{col}", img.crop((x1, y1, x2, y2)),
-                              (x1, y1, x2, y2)))
-    return tiles
+class QuartzWindowProvider:
+    """On-screen application windows, front to back, via
+    CGWindowListCopyWindowInfo (no Screen Recording permission needed for
+    owner names and bounds). Menu bar, dock and other non-zero layers are
+    excluded. Anything with a windows() method returning WindowInfo lists
+    can stand in for it (see set_window_provider)."""
 
-# ---------------------------------------------------------------------------
-# NudeNet helpers (from guardian.py v8.1)
-# ---------------------------------------------------------------------------
+    MIN_SIDE = 100
 
-def fmt_detections(results: list) -> str:
-    if not results:
-        return "[]"
-    return "[" + ", ".join(
-        f"{{'class': '{d.get('class','')}', 'score': {d.get('score',0):.3f}}}"
-        for d in results) + "]"
+    def windows(self) -> list:
+        try:
+            import Quartz
+            infos = Quartz.CGWindowListCopyWindowInfo(
+                Quartz.kCGWindowListOptionOnScreenOnly
+                | Quartz.kCGWindowListExcludeDesktopElements,
+                Quartz.kCGNullWindowID) or []
+        except Exception:
+            return []
+        out = []
+        for w in infos:
+            if w.get("kCGWindowLayer", 0) != 0 or w.get("kCGWindowAlpha", 1) == 0:
+                continue
+            b = w.get("kCGWindowBounds") or {}
+            bounds = (b.get("X", 0), b.get("Y", 0), b.get("Width", 0), b.get("Height", 0))
+            if bounds[2] < self.MIN_SIDE or bounds[3] < self.MIN_SIDE:
+                continue
+            owner = str(w.get("kCGWindowOwnerName", ""))
+            out.append(WindowInfo(owner, bounds, not out, owner in MEDIA_APPS))
+        return out
+
+
+_window_provider = None
+
+
+def get_window_provider():
+    global _window_provider
+    if _window_provider is None:
+        _window_provider = QuartzWindowProvider()
+    return _window_provider
+
+
+def set_window_provider(provider):
+    """Swap in another window source (benchmarks, tests)."""
+    global _window_provider
+    _window_provider = provider
+
+
+def window_box(img, win: WindowInfo) -> tuple:
+    """(x1, y1, x2, y2) pixel box of win's visible part on img's display, or
+    None when too little of it is there."""
+    info = img.info.get("display")
+    if not info:
+        return None
+    dx, dy, dw, dh = info["bounds"]
+    sx, sy = img.width / dw, img.height / dh      # points → pixels (Retina 2x)
+    wx, wy, ww, wh = win.bounds
+    x1, y1 = max(wx, dx), max(wy, dy)
+    x2, y2 = min(wx + ww, dx + dw), min(wy + wh, dy + dh)
+    if x2 - x1 < QuartzWindowProvider.MIN_SIDE or y2 - y1 < QuartzWindowProvider.MIN_SIDE:
+        return None
+    return (int((x1 - dx) * sx), int((y1 - dy) * sy),
+            int((x2 - dx) * sx), int((y2 - dy) * sy))
+
+
+def window_rois(img, windows: list, max_rois: int = 3) -> list:
+    """[(label, (x1, y1, x2, y2))] pixel boxes on img for the frontmost and
+    media windows that lie on its display. Windows covering nearly the whole
+    display give no ROI (the display is scanned as a whole anyway)."""
+    rois = []
+    for i, win in enumerate(windows):
+        if not (win.frontmost or win.media):
+            continue
+        box = window_box(img, win)
+        if box is None:
+            continue
+        if (box[2] - box[0]) * (box[3] - box[1]) > 0.9 * img.width * img.height:
+            return []
+        rois.append((f"w{i}{'m' if win.media else ''}", box))
+        if len(rois) >= max_rois:
+            break
+    return rois
+
+
+def _inside_any(box: tuple, rois: list) -> bool:
+    x1, y1, x2, y2 = box
+    return any(x1 >= r[0] and y1 >= r[1] and x2 <= r[2] and y2 <= r[3] for _, r in rois)
+
+# ---------------------------------------------------------------------------
+# Display scheduling — which displays to scan this cycle, in what order
+# ---------------------------------------------------------------------------
+
+def cursor_location():
+    """Global cursor position in points, or None."""
+    try:
+        import Quartz
+        p = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
+        return p.x, p.y
+    except Exception:
+        return None
+
+
+def _display_key(mon_idx: int, img):
+    info = img.info.get("display")
+    return info["id"] if info else mon_idx
+
+
+def _display_contains(img, point) -> bool:
+    info = img.info.get("display")
+    if not info or point is None:
+        return False
+    x, y, w, h = info["bounds"]
+    return x <= point[0] < x + w and y <= point[1] < y + h
+
+
+class DisplayScheduler:
+    """Per-display change detection and priority.
+
+    Each display (keyed by its CGDirectDisplayID where capture recorded one)
+    keeps a 64x36 gray thumbnail of the frame it was last scanned on. plan()
+    orders displays focus-first — the one holding the frontmost window, else
+    the one containing focus_point() (the cursor by default). The focus
+    display is scanned every cycle. Change detection only throttles the
+    others: they are skipped while unchanged since their last scan, until
+    DISPLAY_MAX_STALE seconds have passed, and scanned at most every
+    DISPLAY_SECONDARY_INTERVAL seconds when changed.
+    mark_scanned() records the frames a completed scan covered.
+
+    regions() gives each planned display its window ROIs (frontmost and
+    media windows) and whether the rest of the display is due this scan:
+    every ROI_BACKGROUND_EVERY-th scan, or always when it has no ROI or is
+    new/stale.
+    """
+
+    CHANGED_CELLS = 4          # thumbnail cells differing by > 8 gray levels
+
+    def __init__(self, focus_point=cursor_location, window_provider=None):
+        self._focus_point = focus_point
+        self._window_provider = window_provider
+        self._state = {}       # key -> (thumbnail, scanned_at)
+        self._thumbs = {}      # key -> thumbnail of the frame being planned
+        self._reasons = {}     # key -> why it is scanned this cycle
+        self._scans = {}       # key -> scans so far (ROI background cadence)
+        self._windows = []
+
+    def _focus(self, images: list) -> int:
+        front = next((w for w in self._windows if w.frontmost), None)
+        if front is not None:
+            x, y, w, h = front.bounds
+            point = (x + w / 2, y + h / 2)
+        else:
+            point = self._focus_point()
+        return next((i for i, img in enumerate(images) if _display_contains(img, point)), 0)
+
+    @staticmethod
+    def _thumbnail(img):
+        import numpy as np
+        from PIL import Image
+        return np.asarray(img.resize((64, 36), Image.BILINEAR, reducing_gap=2.0)
+                          .convert("L"), dtype=np.int16)
+
+    def plan(self, images: list) -> list:
+        """Indices of the displays to scan now, highest priority first."""
+        import numpy as np
+        now = time.monotonic()
+        provider = self._window_provider or get_window_provider()
+        self._windows = provider.windows()
+        focus = self._focus(images) if len(images) > 1 else 0
+        order, scan_notes, skip_notes = [], [], []
+        self._thumbs, self._reasons = {}, {}
+        for mon_idx in [focus] + [i for i in range(len(images)) if i != focus]:
+            key = _display_key(mon_idx, images[mon_idx])
+            thumb = self._thumbnail(images[mon_idx])
+            self._thumbs[key] = thumb
+            prev = self._state.get(key)
+            if prev is None or prev[0].shape != thumb.shape:
+                reason = "new"
+            else:
+                age = now - prev[1]
+                changed = int((np.abs(thumb - prev[0]) > 8).sum()) >= self.CHANGED_CELLS
+                if age >= DISPLAY_MAX_STALE:
+                    reason = "stale"
+                elif changed and (mon_idx == focus or age >= DISPLAY_SECONDARY_INTERVAL):
+                    reason = "changed"
+                elif mon_idx == focus:
+                    reason = "unchanged"
+                else:
+                    skip_notes.append(f"{mon_idx} ({'changed' if changed else 'unchanged'}, "
+                                      f"scanned {age:.0f}s ago)")
+                    continue
+            self._reasons[key] = reason
+            if mon_idx == focus:
+                reason += ", focus"
+            order.append(mon_idx)
+            scan_notes.append(f"{mon_idx} ({reason})")
+        log.info(f"  Displays: scan {', '.join(scan_notes) or 'none'}"
+                 + (f" | skip {', '.join(skip_notes)}" if skip_notes else ""))
+        return order
+
+    def regions(self, images: list, order: list) -> dict:
+        """{mon_idx: Regions(rois, background)} for the displays in order."""
+        out = {}
+        enabled = load_config().get("roi_scanning", ROI_SCANNING)
+        for mon_idx in order:
+            key = _display_key(mon_idx, images[mon_idx])
+            rois = window_rois(images[mon_idx], self._windows) if enabled else []
+            n = self._scans.get(key, 0)
+            self._scans[key] = n + 1
+            background = (not rois or n % ROI_BACKGROUND_EVERY == 0
+                          or self._reasons.get(key) in ("new", "stale"))
+            out[mon_idx] = Regions(rois, background)
+            if rois:
+                log.info(f"  Monitor {mon_idx} ROIs: "
+                         + ", ".join(f"{label} {b[2] - b[0]}x{b[3] - b[1]}" for label, b in rois)
+                         + ("" if background else " | rest of display deferred"))
+        return out
+
+    @property
+    def windows(self) -> list:
+        """Windows seen by the last plan(), front to back."""
+        return self._windows
+
+    def mark_scanned(self, images: list, order: list, regions: dict = None):
+        """Record displays as scanned. An ROI-only scan (background deferred)
+        does not count, so the display stays due until its rest is covered."""
+        now = time.monotonic()
+        for mon_idx in order:
+            key = _display_key(mon_idx, images[mon_idx])
+            if regions and not regions[mon_idx].background:
+                continue
+            if key in self._thumbs:
+                self._state[key] = (self._thumbs[key], now)
+
+
+_display_scheduler = None
+
+
+def get_display_scheduler() -> DisplayScheduler:
+    global _display_scheduler
+    if _display_scheduler is None:
+        _display_scheduler = DisplayScheduler()
+    return _display_scheduler
+
+# ---------------------------------------------------------------------------
+# Visual evidence — sub-threshold detections accumulated across cycles
+# ---------------------------------------------------------------------------
+
+class EvidenceMap:
+    """Decaying per-region record of trigger-class detections (the only ones
+    a rescan can escalate) that scored DETECTION_ANY or more but stayed under
+    TRIGGER_THRESHOLD.
+
+    Each display is divided into EVIDENCE_GRID x EVIDENCE_GRID cells keyed by
+    (display key, row, col). observe() notes the best such score whose
+    detection box covers each cell this cycle; end_cycle() scales the
+    accumulated scores by EVIDENCE_DECAY and adds those bests. targets()
+    returns pixel boxes around cells that have built up EVIDENCE_RESCAN
+    over EVIDENCE_MIN_CYCLES cycles, for a closer rescan (the region plus
+    FINE_GRID sub-tiles).
+    """
+
+    def __init__(self, decay: float = EVIDENCE_DECAY, grid: int = EVIDENCE_GRID):
+        self._decay = decay
+        self._grid = grid
+        self._cells = {}       # (key, row, col) -> [score, cycles seen]
+        self._cycle = {}       # cell -> best score observed this cycle
+        self._lock = threading.Lock()
+
+    def end_cycle(self):
+        """Decay the accumulated scores, then fold in this cycle's observations."""
+        with self._lock:
+            for cell in list(self._cells):
+                entry = self._cells[cell]
+                entry[0] *= self._decay
+                if entry[0] < 0.01 and cell not in self._cycle:
+                    del self._cells[cell]
+            for cell, best in self._cycle.items():
+                entry = self._cells.setdefault(cell, [0.0, 0])
+                entry[0] += best
+                entry[1] += 1
+            self._cycle = {}
+
+    def observe(self, mon_idx: int, img, box: tuple, results: list):
+        """Record results from a tile whose (x1, y1, x2, y2) box lies on img."""
+        hits = [d for d in results
+                if d.get("class", "") in NUDENET_TRIGGER_LABELS
+                and DETECTION_ANY <= d.get("score", 0) < TRIGGER_THRESHOLD]
+        if not hits:
+            return
+        key = _display_key(mon_idx, img)
+        cw, ch = img.width / self._grid, img.height / self._grid
+        with self._lock:
+            for d in hits:
+                x, y, w, h = d.get("box") or (0, 0, box[2] - box[0], box[3] - box[1])
+                c1 = int((box[0] + x) // cw)
+                r1 = int((box[1] + y) // ch)
+                c2 = int(min(box[0] + x + max(w, 1) - 1, img.width - 1) // cw)
+                r2 = int(min(box[1] + y + max(h, 1) - 1, img.height - 1) // ch)
+                for row in range(max(0, r1), min(self._grid, r2 + 1)):
+                    for col in range(max(0, c1), min(self._grid, c2 + 1)):
+                        cell = (key, row, col)
+                        self._cycle[cell] = max(self._cycle.get(cell, 0.0), d["score"])
+
+    def targets(self, mon_idx: int, img, max_targets: int = 3) -> list:
+        """[(label, (x1, y1, x2, y2))] regions to rescan on img, strongest first."""
+        key = _display_key(mon_idx, img)
+        cw, ch = img.width / self._grid, img.height / self._grid
+        with self._lock:
+            hot = sorted(((score, row, col) for (k, row, col), (score, seen)
+                          in self._cells.items()
+                          if k == key and score >= EVIDENCE_RESCAN
+                          and seen >= EVIDENCE_MIN_CYCLES), reverse=True)
+        boxes = []
+        for score, row, col in hot:
+            # the cell plus half a cell of context on each side
+            box = [max(0, int((col - 0.5) * cw)), max(0, int((row - 0.5) * ch)),
+                   min(img.width, int((col + 1.5) * cw)), min(img.height, int((row + 1.5) * ch))]
+            for other in boxes:
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    other[:] = [min(box[0], other[0]), min(box[1], other[1]),
+                                max(box[2], other[2]), max(box[3], other[3])]
+                    break
+            else:
+                boxes.append(box)
+        return [(f"e{i}", tuple(b)) for i, b in enumerate(boxes[:max_targets])]
+
+
+_evidence_map = None
+
+
+def get_evidence_map() -> EvidenceMap:
+    global _evidence_map
+    if _evidence_map is None:
+        _evidence_map = EvidenceMap()
+    return _evidence_map
+
+# ---------------------------------------------------------------------------
+# AppleScript
+# ---------------------------------------------------------------------------
+
+def _osascript_run(script: str, timeout: float = 5) -> tuple:
+    """(stdout, completed) — completed is False if osascript timed out or
+    could not be run."""
+    try:
+        r = subprocess.run(["osascript", "-e", script],
+                           capture_output=True, text=True, timeout=timeout)
+        return r.stdout.strip(), True
+    except Exception:
+        return "", False
+
+
+def _osascript(script: str, timeout: float = 5) -> str:
+    return _osascript_run(script, timeout)[0]
+
+# ---------------------------------------------------------------------------
+# Browser tab enumeration — one JXA helper for every supported browser
+# ---------------------------------------------------------------------------
+
+# Bulk property reads (windows.tabs.url()) are one Apple Event per browser and
+# build arrays natively, so cost is linear in tab count — unlike the old
+# `set out to out & ...` AppleScript loops, which were O(n²).
+_TAB_JXA = r"""
+ObjC.import("Foundation");
+var BROWSERS = %s;
+var CHROMIUM = ["Google Chrome", "Arc", "Brave Browser", "Microsoft Edge"];
+
+function tabsOf(name) {
+    var out = [], app;
+    try {
+        app = Application(name);
+        if (!app.running()) return out;
+    } catch (e) { return out; }
+    try {
+        if (name === "Firefox") {
+            // No tab dictionary: front tab title of each window via System Events
+            var wt = Application("System Events").processes[name].windows.name();
+            for (var i = 0; i < wt.length; i++) out.push([name, "", wt[i] || "", i === 0 ? 1 : 0]);
+            return out;
+        }
+        var safari = name === "Safari";
+        var urls = app.windows.tabs.url();
+        var titles = safari ? app.windows.tabs.name() : app.windows.tabs.title();
+        var active = -1;
+        try {
+            active = safari ? app.windows[0].currentTab.index() - 1
+                            : app.windows[0].activeTabIndex() - 1;
+        } catch (e) {}
+        for (var w = 0; w < urls.length; w++) {
+            for (var t = 0; t < urls[w].length; t++) {
+                out.push([name, urls[w][t] || "", titles[w][t] || "",
+                          (w === 0 && t === active) ? 1 : 0]);
+            }
+        }
+    } catch (e) {}
+    return out;
+}
+
+function snapshot() {
+    var all = [];
+    for (var i = 0; i < BROWSERS.length; i++) all = all.concat(tabsOf(BROWSERS[i]));
+    return JSON.stringify(all);
+}
+
+function run(argv) {
+    if (argv[0] !== "serve") return snapshot();
+    // Persistent mode: one snapshot line per request line, exit on EOF
+    var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+    var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+    while (true) {
+        var req = stdin.availableData;
+        if (req.length === 0) break;
+        stdout.writeData($(snapshot() + "\n").dataUsingEncoding($.NSUTF8StringEncoding));
+    }
+    return "";
+}
+"""
+
+
+class TabEnumerator:
+    """Persistent `osascript -l JavaScript` helper returning every browser tab.
+
+    The helper is spawned once and answers one JSON line per request, so a
+    scan cycle costs no process spawn or script compile. If the helper dies
+    or stalls it is killed and the cycle falls back to a one-shot run of the
+    same script; the next cycle respawns it.
+
+    snapshot() -> [(browser, url, title, is_active_tab_of_front_window), ...]
+    """
+
+    def __init__(self, browsers: list, timeout: float = 5.0):
+        self._script = _TAB_JXA % json.dumps(list(browsers))
+        self._timeout = timeout
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> list:
+        with self._lock:
+            try:
+                return self._parse(self._query_helper())
+            except Exception as e:
+                log.debug(f"  Tab helper failed ({e}) — one-shot fallback")
+                self.close()
+            try:
+                r = subprocess.run(
+                    ["osascript", "-l", "JavaScript", "-e", self._script],
+                    capture_output=True, text=True, timeout=self._timeout)
+                return self._parse(r.stdout)
+            except Exception:
+                return []
+
+    def close(self):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.kill()
+                proc.wait(timeout=1)
+            except Exception:
+                pass
+
+    def _query_helper(self) -> str:
+        import select
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["osascript", "-l", "JavaScript", "-e", self._script, "serve"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, bufsize=0)
+        self._proc.stdin.write(b"\n")
+        fd = self._proc.stdout.fileno()
+        deadline = time.monotonic() + self._timeout
+        chunks = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("tab helper timed out")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("tab helper exited")
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                return b"".join(chunks).decode("utf-8", "replace")
+
+    @staticmethod
+    def _parse(out: str) -> list:
+        out = out.strip()
+        if not out:
+            return []
+        return [(b, u or "", t or "", bool(a)) for b, u, t, a in json.loads(out)]
+
+
+_tab_enumerator = None
+
+
+def get_tab_enumerator() -> TabEnumerator:
+    global _tab_enumerator
+    if _tab_enumerator is None:
+        _tab_enumerator = TabEnumerator(BROWSERS)
+    return _tab_enumerator
+
+# ---------------------------------------------------------------------------
+# Text scanning helper
+# ---------------------------------------------------------------------------
+
+def scan_text_tiers(text: str, source_id: str, url: str = "") -> tuple:
+    text_lower = text.lower()
+    text_nodots = text_lower.replace(".", "")
+    matcher = get_nsfw_matcher()
+    present = matcher.prefixes_in(text_lower, text_nodots)
+    for pat in matcher.explicit_candidates(present):
+        m = pat.search(text_lower) or pat.search(text_nodots)
+        if m:
+            return True, f"explicit='{m.group()}' source={source_id}", []
+    ambiguous = []
+    seen = set()
+    for pat in matcher.ambiguous_candidates(present):
+        m = pat.search(text_lower)
+        if m and m.group() not in seen:
+            seen.add(m.group())
+            idx = m.start()
+            start = max(0, idx - 150)
+            end = min(len(text), idx + len(m.group()) + 150)
+            context = text[start:end].strip()
+            ambiguous.append((source_id, m.group(), context, url))
+    return False, "", ambiguous
+
+# ---------------------------------------------------------------------------
+# Tiling (from guardian.py v8.1)
+# ---------------------------------------------------------------------------
+
+def grid_boxes(box: tuple, n: int, prefix: str = "g", n_cols: int = None) -> list:
+    """[(name, (x1, y1, x2, y2))] for an n x n_cols grid over box."""
+    n_cols = n_cols if n_cols is not None else n
+    bx, by, bx2, by2 = box
+    w, h = bx2 - bx, by2 - by
+    tw, th = w // n_cols, h // n
+    tiles = []
+    for row in range(n):
+        for col in range(n_cols):
+            x1 = col * tw
+            y1 = row * th
+            x2 = x1 + tw if col < n_cols - 1 else w
+            y2 = y1 + th if row < n - 1 else h
+            tiles.append((f"{prefix}{row}{col}", (bx + x1, by + y1, bx + x2, by + y2)))
+    return tiles
+
+def overlap_boxes(box: tuple, n: int, n_cols: int = None, prefix: str = "o") -> list:
+    """[(name, box)] for the half-offset tiles straddling grid_boxes' seams."""
+    n_cols = n_cols if n_cols is not None else n
+    bx, by, bx2, by2 = box
+    w, h = bx2 - bx, by2 - by
+    tw, th = w // n_cols, h // n
+    ox, oy = tw // 2, th // 2
+    tiles = []
+    for row in range(n - 1):
+        for col in range(n_cols - 1):
+            x1 = max(0, col * tw + ox)
+            y1 = max(0, row * th + oy)
+            x2 = min(w, x1 + tw)
+            y2 = min(h, y1 + th)
+            if x2 - x1 > 50 and y2 - y1 > 50:
+                tiles.append((f"{prefix}{row}{col}", (bx + x1, by + y1, bx + x2, by + y2)))
+    return tiles
+
+def make_grid(img, n: int, prefix: str = "g", n_cols: int = None) -> list:
+    return [(name, img.crop(box), box)
+            for name, box in grid_boxes((0, 0) + img.size, n, prefix, n_cols)]
+
+def make_overlaps(img, n: int, n_cols: int = None, prefix: str = "o") -> list:
+    return [(name, img.crop(box), box)
+            for name, box in overlap_boxes((0, 0) + img.size, n, n_cols, prefix)]
+
+
+class FramePyramid:
+    """One captured frame as an RGB array plus 1/2, 1/4 and 1/8 levels, each
+    built once (box-filter reduce of the level above) on first use, and a
+    grayscale copy of any level, also memoized.
+
+    Tiles are array views into a level — no per-tile crop or resample:
+    view(box, factor) slices level `factor` at the box given in full-
+    resolution pixels, and factor_for() picks the smallest level that still
+    gives a tile at least `side` pixels across.
+    """
+
+    LEVELS = (1, 2, 4, 8)
+
+    def __init__(self, img):
+        self.image = img
+        self.size = img.size
+        self._levels = {}       # factor -> (PIL image, RGB ndarray)
+        self._gray = {}         # factor -> L ndarray
+        self._lock = threading.Lock()
+
+    def _level(self, factor: int) -> tuple:
+        import numpy as np
+        with self._lock:
+            for f in self.LEVELS:
+                if f not in self._levels:
+                    if f == 1:
+                        pil = self.image if self.image.mode == "RGB" else self.image.convert("RGB")
+                    else:
+                        prev = self.LEVELS[self.LEVELS.index(f) - 1]
+                        pil = self._levels[prev][0].reduce(f // prev)
+                    self._levels[f] = (pil, np.asarray(pil))
+                if f == factor:
+                    return self._levels[f]
+        raise ValueError(f"no pyramid level 1/{factor}")
+
+    def level(self, factor: int):
+        """RGB ndarray of the frame at 1/factor resolution."""
+        return self._level(factor)[1]
+
+    def level_image(self, factor: int):
+        """Same level as a PIL image."""
+        return self._level(factor)[0]
+
+    def gray(self, factor: int = 1):
+        """Grayscale (ITU-R 601 luma) ndarray of the 1/factor level."""
+        import numpy as np
+        pil = self._level(factor)[0]
+        with self._lock:
+            if factor not in self._gray:
+                self._gray[factor] = np.asarray(pil.convert("L"))
+            return self._gray[factor]
+
+    def factor_for(self, box: tuple, side: int) -> int:
+        longest = max(box[2] - box[0], box[3] - box[1])
+        return max([f for f in self.LEVELS if longest // f >= side] or [1])
+
+    def view(self, box: tuple, factor: int = 1, gray: bool = False):
+        x1, y1, x2, y2 = (v // factor for v in box)
+        level = self.gray(factor) if gray else self.level(factor)
+        return level[y1:max(y2, y1 + 1), x1:max(x2, x1 + 1)]
+
+    def crop(self, box: tuple):
+        """Native-resolution PIL crop (audit images)."""
+        return self.image.crop(box)
+
+
+def to_pil(tile):
+    """PIL image for a tile that may be an RGB ndarray view."""
+    from PIL import Image
+    if hasattr(tile, "shape"):
+        import numpy as np
+        return Image.fromarray(np.ascontiguousarray(tile))
+    return tile
+
+
+def tile_size(tile) -> tuple:
+    """(width, height) of a PIL image or ndarray tile."""
+    return (tile.shape[1], tile.shape[0]) if hasattr(tile, "shape") else tile.size
+
+TileStats = namedtuple("TileStats", "edge std skin colorful tonal")
+
+
+def tile_activity(img, boxes: list) -> list:
+    """TileStats for each (x1, y1, x2, y2) box of img, from the ~384px level of
+    its frame pyramid.
+
+    edge      fraction of pixels whose gray step to a neighbour exceeds 12
+    std       largest per-channel standard deviation
+    skin      fraction of pixels in the YCbCr skin range (Cb 77–127, Cr 133–173)
+    colorful  Hasler–Süsstrunk colourfulness (0 = grayscale)
+    tonal     fraction of mid-tone pixels away from the tile's background
+              level — high for photographs, low for text and UI
+    """
+    import numpy as np
+    want = max(1, max(img.size) // 384)
+    factor = max(f for f in FramePyramid.LEVELS if f <= want * 1.5)
+    a = frame_pyramid(img).level(factor).astype(np.int16)
+    r, g, b = (a[..., i].astype(np.float32) for i in range(3))
+    gray = a.sum(axis=2) // 3
+    edges = np.zeros(gray.shape, dtype=bool)
+    edges[:, 1:] |= np.abs(np.diff(gray, axis=1)) > 12
+    edges[1:, :] |= np.abs(np.diff(gray, axis=0)) > 12
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+    skin = (cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)
+    rg, yb = r - g, 0.5 * (r + g) - b
+    midtone = (gray >= 40) & (gray <= 215)
+    th, tw = gray.shape
+    out = []
+    for x1, y1, x2, y2 in boxes:
+        sx1, sy1 = min(tw - 1, x1 // factor), min(th - 1, y1 // factor)
+        sx2, sy2 = max(sx1 + 1, x2 // factor), max(sy1 + 1, y2 // factor)
+        win = np.s_[sy1:sy2, sx1:sx2]
+        cell_rg, cell_yb, cell_gray = rg[win], yb[win], gray[win]
+        colorful = (np.hypot(cell_rg.std(), cell_yb.std())
+                    + 0.3 * np.hypot(cell_rg.mean(), cell_yb.mean()))
+        tonal = midtone[win] & (np.abs(cell_gray - np.median(cell_gray)) > 16)
+        out.append(TileStats(float(edges[win].mean()),
+                             float(a[win].reshape(-1, 3).std(axis=0).max()),
+                             float(skin[win].mean()), float(colorful),
+                             float(tonal.mean())))
+    return out
+
+
+def _skin_prefilter_settings() -> dict:
+    cfg = load_config()
+    return {
+        "enabled": bool(cfg.get("skin_prefilter", SKIN_PREFILTER)),
+        "skin_min": float(cfg.get("skin_min_fraction", SKIN_MIN_FRACTION)),
+        "colorful_min": float(cfg.get("colorful_min", COLORFUL_MIN)),
+        "tonal_min": float(cfg.get("tonal_min", TONAL_MIN)),
+    }
+
+
+def select_active_tiles(img, tiles: list, uniform: bool = True,
+                        skin: dict = None) -> tuple:
+    """Drop tiles that cannot hold anything the detector would flag.
+
+    Returns (kept_tiles, skipped_uniform, skipped_no_skin) — the last two
+    are tile names.
+    - uniform: skip tiles whose edge density AND colour std are under
+      TILE_EDGE_MIN / TILE_STD_MIN (blank or flat regions).
+    - skin (settings from _skin_prefilter_settings()): skip tiles with fewer
+      skin-range pixels than skin_min, unless they are colourful (hue
+      present but shifted, e.g. tinted lighting) or photo-like grayscale
+      (tonal), where a missing skin hue proves nothing.
+    """
+    if not tiles:
+        return tiles, [], []
+    kept, skipped_uniform, skipped_skin = [], [], []
+    for tile, st in zip(tiles, tile_activity(img, [t[-1] for t in tiles])):
+        if uniform and st.edge < TILE_EDGE_MIN and st.std < TILE_STD_MIN:
+            skipped_uniform.append(tile[0])
+        elif (skin and st.skin < skin["skin_min"]
+              and st.colorful < skin["colorful_min"] and st.tonal < skin["tonal_min"]):
+            skipped_skin.append(tile[0])
+        else:
+            kept.append(tile)
+    return kept, skipped_uniform, skipped_skin
+
+
+# ---------------------------------------------------------------------------
+# NudeNet helpers (from guardian.py v8.1)
+# ---------------------------------------------------------------------------
+
+def fmt_detections(results: list) -> str:
+    if not results:
+        return "[]"
+    return "[" + ", ".join(
+        f"{{'class': '{d.get('class','')}', 'score': {d.get('score',0):.3f}}}"
+        for d in results) + "]"
 
 def has_interest(results: list) -> bool:
     return any(d.get("class", "") in NUDENET_INTEREST_LABELS
                and d.get("score", 0) >= DETECTION_ANY for d in results)
 
+def _bgr(tile):
+    """Contiguous BGR ndarray — what NudeNet's cv2 pipeline reads a file as —
+    from a PIL image or an RGB ndarray view."""
+    import numpy as np
+    rgb = tile if hasattr(tile, "shape") else np.asarray(tile.convert("RGB"))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+def detect_frames(detector, frames: list, batch_size: int = BURST_BATCH) -> list:
+    """NudeNet results for each PIL frame, in one batched session run per
+    batch_size frames. Models exported with a fixed batch of 1 (or detectors
+    without detect_batch) fall back to one detect() per frame."""
+    arrays = [_bgr(f) for f in frames]
+    try:
+        return detector.detect_batch(arrays, batch_size=batch_size)
+    except Exception as e:
+        log.debug(f"    detect_batch unavailable ({e}) — per-frame detect")
+        return [detector.detect(a) for a in arrays]
+
+
 def check_triggered(results: list) -> tuple:
     for d in results:
         if d.get("class", "") in NUDENET_TRIGGER_LABELS \
@@ -1497,8 +3116,11 @@ def scan_tile(detector, tile_name: str, tile_img, mon_idx: int) -> tuple:
     """
     Returns: (results, triggered_bool, detail_str)
 
+    tile_img: PIL image or RGB ndarray (a FramePyramid view).
+
     Strategy:
-      1) Prefer in-memory detect(tile_img) if NudeNet supports it.
+      1) Prefer in-memory detect() on a BGR ndarray (NudeNet reads arrays
+         directly; PIL images it does not accept).
       2) Fallback to a per-user temp PNG (not a shared fixed filename).
       3) Always delete temp file immediately after detect().
     """
@@ -1508,17 +3130,15 @@ def scan_tile(detector, tile_name: str, tile_img, mon_idx: int) -> tuple:
 
     # 1) Try in-memory path first (fastest, no disk I/O)
     try:
-        results = detector.detect(tile_img)
+        results = detector.detect(_bgr(tile_img))
     except Exception:
         results = None
 
     # 2) Fallback to temp PNG if in-memory detect is unsupported
     if results is None:
-        import os
         import tempfile
-        from pathlib import Path
 
-        tmp_dir = Path.home() / "Library" / "Caches" / "youareloved" / "tmp"
+        tmp_dir = TMP_DIR
         tmp_dir.mkdir(parents=True, exist_ok=True)
 
         tmp_path = None
@@ -1529,7 +3149,7 @@ def scan_tile(detector, tile_name: str, tile_img, mon_idx: int) -> tuple:
                 dir=str(tmp_dir),
             )
             os.close(fd)
-            tile_img.save(tmp_path)
+            to_pil(tile_img).save(tmp_path)
             results = detector.detect(tmp_path)
         except Exception as e:
             log.error(f"    NudeNet error on {tile_name}: {e}")
@@ -1549,8 +3169,9 @@ def scan_tile(detector, tile_name: str, tile_img, mon_idx: int) -> tuple:
     ]
 
     if relevant:
+        tw, th = tile_size(tile_img)
         log.info(
-            f"    {tile_name} ({tile_img.size[0]}x{tile_img.size[1]}): "
+            f"    {tile_name} ({tw}x{th}): "
             f"{len(relevant)} detection(s)"
         )
         for d in relevant:
@@ -1566,14 +3187,174 @@ def scan_tile(detector, tile_name: str, tile_img, mon_idx: int) -> tuple:
 # LAYER P — Process Check
 # ═══════════════════════════════════════════════════════════════════════════
 
+# ---------------------------------------------------------------------------
+# Process enumeration — in-process PID→name table for Layer P
+# ---------------------------------------------------------------------------
+
+def _ps_names() -> set:
+    """Executable names from `ps -eo comm=` (the fork-per-call fallback)."""
+    r = subprocess.run(["ps", "-eo", "comm="],
+                       capture_output=True, text=True, timeout=5)
+    return {line.strip().split("/")[-1] for line in r.stdout.split("\n") if line.strip()}
+
+
+class _LibprocBackend:
+    """macOS: proc_listallpids + proc_pidpath from libproc, via ctypes."""
+
+    kind = "libproc"
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ct = ctypes
+        self._lib = ctypes.CDLL(ctypes.util.find_library("proc") or "/usr/lib/libproc.dylib")
+        self._lib.proc_listallpids.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._lib.proc_pidpath.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32]
+        self._lib.proc_name.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32]
+        self._path_buf = ctypes.create_string_buffer(4096)   # PROC_PIDPATHINFO_MAXSIZE
+
+    def pids(self) -> list:
+        n = self._lib.proc_listallpids(None, 0)
+        if n <= 0:
+            raise OSError("proc_listallpids failed")
+        buf = (self._ct.c_int * (n + 64))()
+        n = self._lib.proc_listallpids(buf, self._ct.sizeof(buf))
+        if n <= 0:
+            raise OSError("proc_listallpids failed")
+        return list(buf[:n])
+
+    def name(self, pid: int) -> str:
+        # Full path basename matches `ps -eo comm=`; proc_name is capped at 32 chars.
+        if self._lib.proc_pidpath(pid, self._path_buf, 4096) > 0:
+            return os.path.basename(self._path_buf.value.decode("utf-8", "replace"))
+        if self._lib.proc_name(pid, self._path_buf, 4096) > 0:
+            return self._path_buf.value.decode("utf-8", "replace")
+        return ""
+
+
+class _PsutilBackend:
+    """psutil (if installed) — any platform."""
+
+    kind = "psutil"
+
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+
+    def pids(self) -> list:
+        return self._psutil.pids()
+
+    def name(self, pid: int) -> str:
+        try:
+            return self._psutil.Process(pid).name()
+        except Exception:
+            return ""
+
+
+class _ProcfsBackend:
+    """Linux /proc — used to test and benchmark Layer P off-Mac."""
+
+    kind = "procfs"
+
+    def __init__(self):
+        if not os.path.isdir("/proc/self"):
+            raise OSError("no /proc")
+
+    def pids(self) -> list:
+        return [int(d) for d in os.listdir("/proc") if d.isdigit()]
+
+    def name(self, pid: int) -> str:
+        try:
+            with open(f"/proc/{pid}/comm", "rb") as f:
+                return f.read().decode("utf-8", "replace").strip()
+        except OSError:
+            return ""
+
+
+_PROC_BACKENDS = {"libproc": _LibprocBackend, "psutil": _PsutilBackend,
+                  "procfs": _ProcfsBackend}
+
+
+class ProcessTable:
+    """Running process names without forking `ps` every cycle.
+
+    Keeps a PID→name cache: each snapshot lists PIDs (one syscall on macOS)
+    and resolves names only for PIDs it hasn't seen. The whole table is
+    re-resolved every `full_refresh` seconds so a reused PID can't keep a
+    stale name for long. If the in-process backend fails, it falls back to
+    `ps` for the rest of the run.
+
+    backend: "libproc" | "psutil" | "procfs" | "ps" | None (first that loads)
+    """
+
+    def __init__(self, backend: str = None, full_refresh: float = 60.0):
+        self._full_refresh = full_refresh
+        self._names = {}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._backend = self._load_backend(backend)
+        self.backend = self._backend.kind if self._backend else "ps"
+
+    @staticmethod
+    def _load_backend(choice: str):
+        if choice == "ps":
+            return None
+        if choice:
+            order = [choice]
+        elif sys.platform == "darwin":
+            order = ["libproc", "psutil"]
+        else:
+            order = ["psutil", "procfs"]
+        for key in order:
+            try:
+                return _PROC_BACKENDS[key]()
+            except Exception as e:
+                log.debug(f"  Process backend {key} unavailable: {e}")
+        return None
+
+    def names(self) -> set:
+        with self._lock:
+            if self._backend is not None:
+                try:
+                    return self._snapshot()
+                except Exception as e:
+                    log.warning(f"  Process backend {self.backend} failed ({e}) — using ps")
+                    self._backend, self.backend = None, "ps"
+                    self._names.clear()
+            try:
+                return _ps_names()
+            except Exception:
+                return set()
+
+    def _snapshot(self) -> set:
+        now = time.monotonic()
+        if now - self._refreshed_at >= self._full_refresh:
+            self._names.clear()
+            self._refreshed_at = now
+        pids = self._backend.pids()
+        live = set(pids)
+        for pid in [p for p in self._names if p not in live]:
+            del self._names[pid]
+        resolve = self._backend.name
+        for pid in pids:
+            if pid not in self._names:
+                self._names[pid] = resolve(pid)
+        return {n for n in self._names.values() if n}
+
+
+_process_table = None
+
+
+def get_process_table() -> ProcessTable:
+    global _process_table
+    if _process_table is None:
+        _process_table = ProcessTable(load_config().get("process_backend"))
+    return _process_table
+
+
 def layer_P() -> tuple:
     log.info("LAYER P — Process Check")
-    try:
-        r = subprocess.run(["ps", "-eo", "comm="],
-                           capture_output=True, text=True, timeout=5)
-        running = {line.strip().split("/")[-1] for line in r.stdout.split("\n")}
-    except Exception:
-        running = set()
+    running = get_process_table().names()
     found = running & SUSPECT_PROCESSES
     if found:
         detail = f"suspect_process={list(found)}"
@@ -1590,93 +3371,84 @@ TAB_BLOCKLIST = [
     "pornhub", "xvideos", "xnxx", "redtube", "porn", "nude",
     "xxx", "onlyfans", "brazzers",
 ]
+_TAB_BLOCKLIST_RE = re.compile("|".join(map(re.escape, TAB_BLOCKLIST)))
+
+
+# Per-tab verdicts keyed by (browser, url, title). Only tabs that are new or
+# changed since the last cycle are scanned; entries for closed tabs are dropped.
+_tab_verdicts: dict = {}
+# browser -> URL of the active tab in its front window (burst-mode trigger)
+_active_tabs: dict = {}
+
+
+def _scan_tab(browser: str, url: str, title: str) -> tuple:
+    """Verdict for one tab: (safe, hit_detail, hit_kind, ambiguous_fragments)."""
+    info = classify_url(url)
+    if info.safe:
+        return True, "", "", []
+
+    # Fast blocklist check — instant trigger on known domains/keywords.
+    # One regex pass decides; on a hit the list order picks the reported term.
+    combined_lower = (url + " " + title).lower()
+    if _TAB_BLOCKLIST_RE.search(combined_lower):
+        term = next(t for t in TAB_BLOCKLIST if t in combined_lower)
+        return (False, f"blocklist={term} tab:{browser} url={url[:80]}",
+                "BLOCKLIST HIT", [])
+
+    explicit, detail, ambiguous = scan_text_tiers(url + " " + title,
+                                                   f"tab:{browser}", url)
+    if explicit:
+        return False, detail, "TIER 1", []
+
+    # Multi-ambiguous auto-escalation: 2+ distinct ambiguous terms
+    # in the same tab = treat as explicit (e.g. "nude" + "ass")
+    distinct_terms = set(a[1] for a in ambiguous)
+    if len(distinct_terms) >= 2:
+        terms = sorted(distinct_terms)
+        return (False, f"multi-ambiguous={'+'.join(terms)} "
+                       f"tab:{browser} url={url[:80]}",
+                "MULTI-AMBIGUOUS → EXPLICIT", ambiguous)
+    return False, "", "", ambiguous
 
 
 def layer_T2() -> tuple:
     log.info("LAYER T2 — Browser Tab Intelligence")
-    raw_tabs = []
-    chrome = _osascript('''
-tell application "System Events"
-    if exists (process "Google Chrome") then
-        tell application "Google Chrome"
-            set out to ""
-            repeat with w in windows
-                repeat with t in tabs of w
-                    set out to out & URL of t & "|||" & title of t & linefeed
-                end repeat
-            end repeat
-            return out
-        end tell
-    end if
-end tell
-''')
-    for line in chrome.split("\n"):
-        if "|||" in line:
-            u, t = line.split("|||", 1)
-            raw_tabs.append(("Chrome", u.strip(), t.strip()))
-    safari = _osascript('''
-tell application "System Events"
-    if exists (process "Safari") then
-        tell application "Safari"
-            set out to ""
-            repeat with w in windows
-                repeat with t in tabs of w
-                    set out to out & URL of t & "|||" & name of t & linefeed
-                end repeat
-            end repeat
-            return out
-        end tell
-    end if
-end tell
-''')
-    for line in safari.split("\n"):
-        if "|||" in line:
-            u, t = line.split("|||", 1)
-            raw_tabs.append(("Safari", u.strip(), t.strip()))
-
-    tabs = []
-    safe_count = 0
-    for browser, url, title in raw_tabs:
-        if is_safe_url(url):
-            safe_count += 1
-        else:
-            tabs.append((browser, url, title))
-            log.info(f"    [{browser}] {title[:60]}")
-
-    log.info(f"  Total: {len(raw_tabs)} ({safe_count} safe, {len(tabs)} scanned)")
-
-    tab_data = [(url, title) for _, url, title in tabs]
-
-    # Fast blocklist check — instant trigger on known domains/keywords
-    for browser, url, title in tabs:
-        combined_lower = (url + " " + title).lower()
-        for term in TAB_BLOCKLIST:
-            if term in combined_lower:
-                detail = f"blocklist={term} tab:{browser} url={url[:80]}"
-                log.info(f"  \u2717 BLOCKLIST HIT: {detail}")
+    snapshot = get_tab_enumerator().snapshot()
+    raw_tabs = [(browser, url, title) for browser, url, title, _ in snapshot]
+    _active_tabs.clear()
+    _active_tabs.update((browser, url) for browser, url, _, active in snapshot if active)
+
+    current = set(raw_tabs)
+    for key in [k for k in _tab_verdicts if k not in current]:
+        del _tab_verdicts[key]
+    new_count = 0
+    for key in raw_tabs:
+        if key not in _tab_verdicts:
+            _tab_verdicts[key] = _scan_tab(*key)
+            new_count += 1
+            if not _tab_verdicts[key][0]:
+                log.info(f"    [{key[0]}] {key[2][:60]}")
+
+    tabs = [(key, _tab_verdicts[key]) for key in raw_tabs
+            if not _tab_verdicts[key][0]]
+    safe_count = len(raw_tabs) - len(tabs)
+    log.info(f"  Total: {len(raw_tabs)} ({safe_count} safe, {len(tabs)} scanned, "
+             f"{new_count} new/changed)")
+
+    tab_data = [(url, title) for (_, url, title), _ in tabs]
+
+    # Blocklist hits first (as before), then tier/multi-ambiguous hits, tab order
+    for kinds in (("BLOCKLIST HIT",), ("TIER 1", "MULTI-AMBIGUOUS → EXPLICIT")):
+        for _, (_, detail, kind, _) in tabs:
+            if kind in kinds:
+                log.info(f"  \u2717 {kind}: {detail}")
                 return True, detail, [], tab_data
 
+    # Cross-tab aggregation always sees every open tab's cached fragments
     all_ambiguous = []
-
-    for browser, url, title in tabs:
-        combined = url + " " + title
-        explicit, detail, ambiguous = scan_text_tiers(combined,
-                                                       f"tab:{browser}", url)
-        if explicit:
-            log.info(f"  ✗ TIER 1: {detail}")
-            return True, detail, [], tab_data
+    for _, (_, _, _, ambiguous) in tabs:
         all_ambiguous.extend(ambiguous)
 
-        # Multi-ambiguous auto-escalation: 2+ distinct ambiguous terms
-        # in the same tab = treat as explicit (e.g. "nude" + "ass")
-        distinct_terms = set(a[1] for a in ambiguous)
-        if len(distinct_terms) >= 2:
-            terms = sorted(distinct_terms)
-            detail = (f"multi-ambiguous={'+'.join(terms)} "
-                      f"tab:{browser} url={url[:80]}")
-            log.info(f"  ✗ MULTI-AMBIGUOUS → EXPLICIT: {detail}")
-            return True, detail, [], tab_data
-
     # Also check across all tabs — if 3+ distinct ambiguous across all tabs
     all_distinct = set(a[1] for a in all_ambiguous)
     if len(all_distinct) >= 3:
@@ -1701,26 +3473,17 @@ end tell
 
 def layer_T3(tab_data: list) -> tuple:
     log.info("LAYER T3 — Confirmed Memory Recall")
-    mem = load_memory()
-    known_urls = set(mem.get("urls", {}).keys())
-    known_domains = set(mem.get("domains", {}).keys())
+    known_urls, known_domains = memory_index()
     if not known_urls and not known_domains:
         log.info(f"  Memory empty")
         log.info(f"  Layer T3: CLEAR")
         return False, ""
     log.info(f"  Memory: {len(known_urls)} URLs, {len(known_domains)} domains")
     for url, title in tab_data:
-        if is_safe_url(url):
+        info = classify_url(url)
+        if info.safe:
             continue
-        domain = ""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url.lower() if "://" in url.lower()
-                              else f"https://{url.lower()}")
-            domain = parsed.netloc.replace("www.", "")
-        except Exception:
-            pass
-        if url in known_urls or domain in known_domains:
+        if url in known_urls or (info.domain and known_domains.match(info.domain)):
             log.info(f"  Memory candidate: {url[:80]}")
             if validate_memory_hit(url):
                 log.info(f"  ✗ VALID MEMORY HIT")
@@ -1734,154 +3497,616 @@ def layer_T3(tab_data: list) -> tuple:
 # LAYER T1 — OCR Surface Scan
 # ═══════════════════════════════════════════════════════════════════════════
 
-def layer_T1(images: list) -> tuple:
-    from PIL import Image
+class OcrCache:
+    """Bounded LRU from tile content hash to OCR text and its scan_text_tiers
+    verdict, so static regions (editors, docs, sidebars) skip Tesseract.
+
+    Keys hash the exact grayscale pixels OCR would see, plus the term-set
+    fingerprint so a changed term list re-scans cached text. Per-cycle hit
+    counts and the OCR seconds they saved are reset by new_cycle().
+    """
+
+    def __init__(self, max_entries: int = OCR_CACHE_SIZE):
+        from collections import OrderedDict
+        self._entries = OrderedDict()   # key -> [text, ocr_seconds, tiers or None]
+        self._max = max_entries
+        self._lock = threading.Lock()
+        self.new_cycle()
+
+    def new_cycle(self):
+        self.hits = self.misses = 0
+        self.saved = 0.0
+
+    @staticmethod
+    def key(tile) -> str:
+        import numpy as np
+        digest = hashlib.blake2b(np.ascontiguousarray(tile).tobytes(), digest_size=16)
+        digest.update(f"{tile.shape}|{nsfw_terms_fingerprint()}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved += entry[1]
+            return entry
+
+    def put(self, key: str, text: str, seconds: float):
+        with self._lock:
+            self._entries[key] = [text, seconds, None]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def set_tiers(self, key: str, tiers: tuple):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key][2] = tiers
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_ocr_cache = None
+
+
+def get_ocr_cache() -> OcrCache:
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = OcrCache(int(load_config().get("ocr_cache_size", OCR_CACHE_SIZE)))
+    return _ocr_cache
+
+
+def _ocr_tile(pyramid: FramePyramid, box: tuple, factor: int = 2) -> tuple:
+    """OCR one region from the 1/factor pyramid level, in grayscale, through
+    the OCR cache. Returns (text, cache_key, cached tiers or None); text is ""
+    on failure, and failures are not cached."""
+    tile = pyramid.view(box, factor, gray=True)
+    cache = get_ocr_cache()
+    key = cache.key(tile)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry[0], key, entry[2]
+    started = time.perf_counter()
+    try:
+        text = get_tesseract().image_to_string(tile, timeout=8)
+    except Exception:
+        return "", None, None
+    seconds = time.perf_counter() - started
+    metric_observe("ocr_tile", seconds)
+    cache.put(key, text, seconds)
+    return text, key, None
+
+
+# strokes: fraction of pixels with a crisp (> 48 gray levels) step to a neighbour
+# crisp:   crisp steps as a share of all non-flat (> 8) steps — glyph edges are
+#          sharp, photo edges mostly soft
+# pixels: crisp-edge pixel count; strokes: the same as a share of the tile;
+# crisp: crisp share of all edges
+TextStats = namedtuple("TextStats", "pixels strokes crisp")
+
+
+def text_likelihood(gray) -> TextStats:
+    """TextStats for a grayscale tile, at the resolution it would be OCR'd at."""
+    import numpy as np
+    g = np.asarray(gray, dtype=np.int16)
+    if g.shape[0] < 2 or g.shape[1] < 2:
+        return TextStats(0, 0.0, 0.0)
+    step = np.maximum(np.abs(np.diff(g, axis=1))[:-1], np.abs(np.diff(g, axis=0))[:, :-1])
+    crisp = int((step > 48).sum())
+    edges = int((step > 8).sum())
+    return TextStats(crisp, crisp / step.size, crisp / edges if edges else 0.0)
+
+
+def select_text_tiles(pyramid: FramePyramid, tiles: list) -> tuple:
+    """Split [(tile_id, box, factor)] into (text, image_only, empty).
+
+    Stats come from the tile's own pyramid level in grayscale. Tiles with
+    fewer than TEXT_EMPTY_PIXELS crisp-edge pixels are empty (only their
+    ids are returned) — an absolute count, so a lone word counts the same
+    on any display size; tiles
+    whose edges are mostly soft (photos, gradients — possibly with a caption
+    on top) are image-only. Both kept lists are densest first, so the most
+    text-heavy tiles reach Tesseract first.
+    """
+    text, image_only, empty = [], [], []
+    for tile in tiles:
+        st = text_likelihood(pyramid.view(tile[1], tile[2], gray=True))
+        if st.pixels < TEXT_EMPTY_PIXELS:
+            empty.append(tile[0])
+        elif st.crisp < TEXT_CRISP_MIN:
+            image_only.append((st.strokes, tile))
+        else:
+            text.append((st.strokes, tile))
+    text.sort(key=lambda x: -x[0])
+    image_only.sort(key=lambda x: -x[0])
+    return [t for _, t in text], [t for _, t in image_only], empty
+
+
+def _split_box(box: tuple, tile_w: int, tile_h: int) -> list:
+    """[(row, col, sub_box)] covering box with tiles of about tile_w x tile_h."""
+    x1, y1, x2, y2 = box
+    rows = max(1, round((y2 - y1) / tile_h))
+    cols = max(1, round((x2 - x1) / tile_w))
+    return [(r, c, (x1 + (x2 - x1) * c // cols, y1 + (y2 - y1) * r // rows,
+                    x1 + (x2 - x1) * (c + 1) // cols, y1 + (y2 - y1) * (r + 1) // rows))
+            for r in range(rows) for c in range(cols)]
+
+
+def layer_T1(images: list, order: list = None, regions: dict = None) -> tuple:
+    """OCR a 3x3 grid on each display in `order` (default all), cut from the
+    display's 1/2 pyramid level. Tiles from all displays run concurrently on
+    the shared pool, focused display first; the first explicit hit returns.
+    With the text prefilter on, empty grid tiles are skipped and image-only
+    ones are OCR'd after everything else; ROI tiles are never filtered.
+
+    With `regions` (DisplayScheduler.regions()), window ROIs are OCR'd first
+    at native resolution, and the half-resolution grid only covers the rest
+    of a display on scans where its background is due."""
+    import concurrent.futures
     log.info(f"LAYER T1 — OCR Surface Scan (3x3, {len(images)} monitor(s))")
     if not HAS_TESSERACT:
         log.info(f"  pytesseract unavailable — skipping")
         return False, "", [], 0
-    total_words = 0
-    all_ambiguous = []
-    for mon_idx, img in enumerate(images):
-        w, h = img.size
+    order = list(range(len(images))) if order is None else list(order)
+    regions = regions or {}
+    prefilter = bool(load_config().get("text_prefilter", TEXT_PREFILTER))
+    cache = get_ocr_cache()
+    cache.new_cycle()
+    work = get_executor().cpu
+    pending = {}    # future -> (rank, mon_idx, tile_seq, tile_id)
+    skipped = 0         # empty grid tiles
+    for rank, mon_idx in enumerate(order):
+        pyramid = frame_pyramid(images[mon_idx])
+        w, h = pyramid.size
         tw, th = w // 3, h // 3
-        mon_words = 0
-        log.info(f"  Monitor {mon_idx}: {w}x{h}")
+        rois, background = regions.get(mon_idx, Regions([], True))
+        # (tile_id, box, pyramid level): ROIs at native resolution, then the grid
+        roi_tiles = [(f"mon{mon_idx}_{label}_r{row}c{col}", sub, 1)
+                     for label, box in rois for row, col, sub in _split_box(box, tw, th)]
+        grid_tiles = []
+        deferred = 0
         for row in range(3):
             for col in range(3):
                 x1, y1 = col * tw, row * th
                 x2 = x1 + tw if col < 2 else w
                 y2 = y1 + th if row < 2 else h
-                tile_id = f"mon{mon_idx}_r{row}c{col}"
-                tile = img.crop((x1, y1, x2, y2))
-                small = tile.resize((tile.width // 2, tile.height // 2),
-                                    Image.LANCZOS)
-                try:
-                    text = pytesseract.image_to_string(small, timeout=8)
-                except Exception:
-                    continue
-                if not text.strip():
+                if not background or _inside_any((x1, y1, x2, y2), rois):
+                    deferred += 1
                     continue
-                mon_words += len(text.split())
-                if any(p in text.lower() for p in OCR_SUPPRESS):
-                    continue
-                explicit, detail, ambiguous = scan_text_tiers(text,
-                                                               f"ocr:{tile_id}")
-                if explicit:
-                    log.info(f"  ✗ TIER 1: {detail}")
-                    return True, detail, [], total_words + mon_words
-                all_ambiguous.extend(ambiguous)
-        total_words += mon_words
-        log.info(f"    Extracted: {mon_words} words")
+                grid_tiles.append((f"mon{mon_idx}_r{row}c{col}", (x1, y1, x2, y2), 2))
+        notes = []
+        image_tiles = []
+        if prefilter:
+            grid_tiles, image_tiles, empty = select_text_tiles(pyramid, grid_tiles)
+            skipped += len(empty)
+            if empty or image_tiles:
+                notes.append(f"text prefilter: {len(empty)} empty skipped, "
+                             f"{len(image_tiles)} image-only queued last")
+        seq = 0
+        for level, tiles in ((PRIORITY_ROI, roi_tiles), (PRIORITY_COARSE, grid_tiles),
+                             (PRIORITY_IMAGE_ONLY, image_tiles)):
+            for tile_id, box, factor in tiles:
+                fut = work.submit(level + rank, _ocr_tile, pyramid, box, factor)
+                pending[fut] = (rank, mon_idx, seq, tile_id)
+                seq += 1
+        log.info(f"  Monitor {mon_idx}: {w}x{h}"
+                 + (f" | {len(rois)} ROI(s) native" if rois else "")
+                 + (f" | {deferred}/9 grid tiles skipped" if deferred else "")
+                 + "".join(f" | {n}" for n in notes))
+
+    words = {mon_idx: 0 for mon_idx in order}
+    found = []      # ((rank, tile_seq), ambiguous) — sorted to keep a stable order
+    try:
+        for fut in concurrent.futures.as_completed(list(pending)):
+            rank, mon_idx, seq, tile_id = pending.pop(fut)
+            text, key, tiers = fut.result()
+            if not text.strip():
+                continue
+            words[mon_idx] += len(text.split())
+            if any(p in text.lower() for p in OCR_SUPPRESS):
+                continue
+            source = f"ocr:{tile_id}"
+            if tiers is None:
+                tiers = scan_text_tiers(text, source)
+                if key and not tiers[0]:      # explicit details name their tile
+                    cache.set_tiers(key, tiers)
+            explicit, detail, ambiguous = tiers
+            ambiguous = [(source, word, ctx, url) for _, word, ctx, url in ambiguous]
+            if explicit:
+                log.info(f"  ✗ TIER 1: {detail}")
+                return True, detail, [], sum(words.values())
+            found.append(((rank, seq), ambiguous))
+    finally:
+        for f in pending:
+            f.cancel()
+    for mon_idx in order:
+        log.info(f"    Monitor {mon_idx} extracted: {words[mon_idx]} words")
+    all_ambiguous = [a for _, amb in sorted(found, key=lambda x: x[0]) for a in amb]
+    total_words = sum(words.values())
     if all_ambiguous:
         log.info(f"  Tier 2 ambiguous: {len(all_ambiguous)}")
-    log.info(f"  Layer T1: CLEAR ({total_words} words)")
+    if cache.hits:
+        log.info(f"  OCR cache: {cache.hits}/{cache.hits + cache.misses} tiles unchanged, "
+                 f"{cache.saved:.1f}s OCR saved")
+    if skipped:
+        log.info(f"  Layer T1: CLEAR ({total_words} words; {skipped} empty tiles not OCR'd)")
+    else:
+        log.info(f"  Layer T1: CLEAR ({total_words} words)")
     return False, "", all_ambiguous, total_words
 
 # ═══════════════════════════════════════════════════════════════════════════
 # LAYER V — Visual Scan (NudeNet adaptive two-pass)
 # ═══════════════════════════════════════════════════════════════════════════
 
-def layer_V(images: list) -> tuple:
+# Work-queue priorities: lower runs first. Within a level, displays run in
+# scheduling order (priority + display rank), so the focused display's tiles
+# go ahead of the others'.
+PRIORITY_FINE = 0      # sub-tiles of a hot tile
+PRIORITY_FULL = 16     # full-frame fast pass
+PRIORITY_ROI = 24      # frontmost/media window tiles (T1: native; V: see scan_view)
+PRIORITY_COARSE = 32   # coarse/overlap tiles
+PRIORITY_IMAGE_ONLY = 40  # OCR tiles the text prefilter judged image-only
+
+DETECT_SIDE = 640      # NudeNet 640m input: tiles come from the smallest
+                       # pyramid level that is still at least this big
+
+
+def _grid_shape(w: int, h: int) -> tuple:
+    """Coarse (rows, cols), adapted to aspect ratio so tiles stay roughly square."""
+    sqrt_a = (w / h) ** 0.5
+    return (max(2, round(COARSE_GRID / sqrt_a)),
+            max(COARSE_GRID, round(COARSE_GRID * sqrt_a)))
+
+
+def roi_boxes(label: str, box: tuple, tile_w: int, tile_h: int) -> list:
+    """[(name, box)] for one window ROI: the whole window, plus a grid (and
+    overlaps) of roughly coarse-tile size when it is larger than one tile."""
+    x1, y1, x2, y2 = box
+    tiles = [(label, box)]
+    rows = max(1, round((y2 - y1) / tile_h))
+    cols = max(1, round((x2 - x1) / tile_w))
+    if rows * cols > 1:
+        tiles += (grid_boxes(box, rows, prefix=f"{label}_c", n_cols=cols)
+                  + overlap_boxes(box, rows, n_cols=cols, prefix=f"{label}_o"))
+    return tiles
+
+
+def scan_view(detector, tile_name: str, pyramid: FramePyramid, box: tuple,
+              mon_idx: int) -> tuple:
+    """scan_tile() on the pyramid view of box, cut from the smallest level
+    still >= DETECT_SIDE on its longer side (native only for boxes below
+    2 x DETECT_SIDE). Detection boxes are returned in full-resolution pixels
+    relative to the tile, whatever level was used."""
+    factor = pyramid.factor_for(box, DETECT_SIDE)
+    results, triggered, detail = scan_tile(detector, tile_name,
+                                           pyramid.view(box, factor), mon_idx)
+    if factor > 1:
+        results = [dict(d, box=[v * factor for v in d["box"]]) if d.get("box") else d
+                   for d in results]
+    return results, triggered, detail
+
+
+def layer_V(images: list, order: list = None, regions: dict = None,
+            evidence: EvidenceMap = None) -> tuple:
+    """Scan the displays in `order` (indices into images; default all)
+    concurrently through the shared inference pool.
+
+    Per display: the mandatory full-frame pass, then coarse + overlap tiles
+    once it comes back clean, then FINE_GRID sub-tiles of any hot tile.
+    Results are consumed as they complete across all displays; the first
+    trigger cancels everything still queued. Tiles are views into one
+    FramePyramid per display, each cut from the smallest level that still
+    fills the detector input.
+
+    With `regions`, window ROIs (the whole window plus grid-sized tiles, see
+    roi_boxes) are queued ahead of the coarse grid, and coarse tiles are only queued for the rest
+    of a display on scans where its background is due.
+
+    With `evidence`, every clean result is recorded in it, and regions it
+    holds persistent sub-threshold evidence for are rescanned first (the
+    region plus FINE_GRID sub-tiles) — on displays
+    outside `order` that rescan is all they get this cycle. A rescan's own
+    results are not recorded, so evidence nothing else re-observes decays
+    after one rescan instead of renewing itself.
+    """
+    import concurrent.futures
     log.info("LAYER V — NudeNet Adaptive Scan")
     log.info(f"  Trigger: {TRIGGER_THRESHOLD} | Interest: {DETECTION_ANY}")
     detector = get_detector()
-
-    for mon_idx, img in enumerate(images):
+    adaptive = bool(load_config().get("adaptive_tiling", ADAPTIVE_TILING))
+    prefilter = _skin_prefilter_settings()
+    prefilter_skips = [0, 0]      # uniform, no-skin — reported when CLEAR
+    order = list(range(len(images))) if order is None else list(order)
+    regions = regions or {}
+    pyramids = [frame_pyramid(img) for img in images]
+    work = get_executor().cpu
+    pending = {}    # future -> (mon_idx, rank, name, parent_name or None, box)
+
+    def submit(level, rank, mon_idx, name, box, parent=None):
+        fut = work.submit(level + rank, scan_view, detector, name, pyramids[mon_idx],
+                          box, mon_idx)
+        pending[fut] = (mon_idx, rank, name, parent, box)
+
+    def submit_fine(rank, mon_idx, name, box, parent):
+        for sname, sbox in grid_boxes(box, FINE_GRID, prefix=f"{name}_f"):
+            submit(PRIORITY_FINE, rank, mon_idx, sname, sbox, parent=parent)
+
+    def on_full_clear(mon_idx, rank, full_r):
+        img = images[mon_idx]
         w, h = img.size
-
-        # Adapt grid to aspect ratio so tiles stay roughly square for NudeNet
-        aspect = w / h
-        sqrt_a = aspect ** 0.5
-        n_rows = max(2, round(COARSE_GRID / sqrt_a))
-        n_cols = max(COARSE_GRID, round(COARSE_GRID * sqrt_a))
-
+        n_rows, n_cols = _grid_shape(w, h)
+        all_coarse = (grid_boxes((0, 0, w, h), n_rows, prefix="c", n_cols=n_cols)
+                      + overlap_boxes((0, 0, w, h), n_rows, n_cols=n_cols))
+        rois, background = regions.get(mon_idx, Regions([], True))
+        if rois or not background:
+            kept = [t for t in all_coarse if background and not _inside_any(t[1], rois)]
+            if len(kept) < len(all_coarse):
+                log.info(f"  Monitor {mon_idx}: {len(all_coarse) - len(kept)} coarse tile(s) "
+                         + ("inside ROIs skipped" if background else "deferred (ROI-only scan)"))
+            all_coarse = kept
+        roi_list = [t for label, box in rois
+                    for t in roi_boxes(label, box, w // n_cols, h // n_rows)]
+        # Skin prefilter never applies once the full frame showed interest
+        skin = prefilter if prefilter["enabled"] and not has_interest(full_r) else None
+        if adaptive or skin:
+            total = len(all_coarse) + len(roi_list)
+            all_coarse, skip_u, skip_s = select_active_tiles(
+                img, all_coarse, uniform=adaptive, skin=skin)
+            roi_list, roi_u, roi_s = select_active_tiles(
+                img, roi_list, uniform=adaptive, skin=skin)
+            skip_u, skip_s = skip_u + roi_u, skip_s + roi_s
+            if skip_u or skip_s:
+                log.info(f"  Monitor {mon_idx} prefilter: {len(all_coarse) + len(roi_list)}/"
+                         f"{total} tiles scanned ({len(skip_u)} uniform, "
+                         f"{len(skip_s)} no-skin skipped)")
+            prefilter_skips[0] += len(skip_u)
+            prefilter_skips[1] += len(skip_s)
+        for name, box in roi_list:
+            submit(PRIORITY_ROI, rank, mon_idx, name, box)
+        for name, box in all_coarse:
+            submit(PRIORITY_COARSE, rank, mon_idx, name, box)
+
+    for rank, mon_idx in enumerate(order):
+        w, h = images[mon_idx].size
+        n_rows, n_cols = _grid_shape(w, h)
         log.info(
             f"  Monitor {mon_idx}: {w}x{h} → grid {n_cols}×{n_rows} "
-            f"(~{w//n_cols}×{h//n_rows}px/tile)"
-        )
-        log.info(
-            f"  Pass 1: {n_cols}x{n_rows} coarse | "
-            f"Pass 2: {FINE_GRID}x{FINE_GRID} fine on hot tiles"
+            f"(~{w//n_cols}×{h//n_rows}px/tile) | Pass 2: {FINE_GRID}x{FINE_GRID} "
+            f"fine on hot tiles"
         )
-
-        # ─────────────────────────────────────────────────────────────
         # FAST PASS (mandatory): full-frame evaluation before any tiling
-        # ─────────────────────────────────────────────────────────────
-        full_r, full_t, full_d = scan_tile(detector, "full", img, mon_idx)
+        submit(PRIORITY_FULL, rank, mon_idx, "full", (0, 0, w, h))
+
+    rescans = {"evidence"}      # parents of evidence rescan tiles
+    if evidence is not None:
+        # Persistent sub-threshold regions, ahead of everything else; the only
+        # work queued for unchanged displays. Like every tile, each is cut
+        # from the smallest pyramid level >= DETECT_SIDE, so the fine
+        # sub-tiles are what look at the region in more detail.
+        ranked = order + [i for i in range(len(images)) if i not in order]
+        for rank, mon_idx in enumerate(ranked):
+            for label, box in evidence.targets(mon_idx, images[mon_idx]):
+                log.info(f"  Monitor {mon_idx} evidence rescan '{label}' "
+                         f"({box[2] - box[0]}x{box[3] - box[1]})"
+                         + ("" if mon_idx in order else " — display otherwise unchanged"))
+                submit(PRIORITY_FINE, rank, mon_idx, label, box, parent="evidence")
+                submit_fine(rank, mon_idx, label, box, parent=label)
+                rescans.add(label)
+
+    hot = 0
+    try:
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                mon_idx, rank, name, parent, box = pending.pop(fut)
+                if fut.cancelled():
+                    continue
+                r, t, d = fut.result()
+                if evidence is not None and not t and parent not in rescans:
+                    evidence.observe(mon_idx, images[mon_idx], box, r)
+                if t:
+                    cancelled = sum(f.cancel() for f in pending)
+                    where = f"'{name}' (parent: {parent})" if parent else f"'{name}'"
+                    log.warning(f"  >>> NSFW on monitor {mon_idx} {where}: {fmt_detections(r)}"
+                                + (f" — {cancelled} queued tile(s) cancelled"
+                                   if cancelled else ""))
+                    return True, d, mon_idx, name, r, images[mon_idx], pyramids[mon_idx].crop(box)
+                if name == "full":
+                    # Always surface the best full-frame score (observability only)
+                    best = max(r, key=lambda x: x.get("score", 0.0)) if r else {}
+                    log.info(f"  Monitor {mon_idx} full-frame top: "
+                             f"{best.get('class') or 'NONE'} {float(best.get('score', 0.0) or 0.0):.3f}"
+                             f" | raw={len(r)} triggered=False")
+                    on_full_clear(mon_idx, rank, r)
+                elif parent is None and has_interest(r):
+                    hot += 1
+                    log.info(f"    Monitor {mon_idx} hot '{name}' ({box[2] - box[0]}x{box[3] - box[1]})"
+                             f" → {FINE_GRID}x{FINE_GRID} fine sub-tiles queued")
+                    submit_fine(rank, mon_idx, name, box, parent=name)
+    finally:
+        for f in pending:     # trigger or error: drop this scan's queued tiles
+            f.cancel()
+
+    if not hot:
+        log.info("  PASS 2 — No hot tiles, skipped")
+    if any(prefilter_skips):
+        log.info(f"  Layer V: CLEAR ({prefilter_skips[0]} uniform + "
+                 f"{prefilter_skips[1]} no-skin tiles skipped)")
+    else:
+        log.info("  Layer V: CLEAR")
+    return False, "", -1, "", [], None, None
 
-        # Always surface the best full-frame score (even when empty)
-        # (observability only; does not change detection thresholds)
-        b_cls = "NONE"
-        b_sc = 0.0
-        try:
-            if full_r:
-                best = max(full_r, key=lambda d: d.get("score", 0.0))
-                b_cls = best.get("class", "NONE") or "NONE"
-                b_sc = float(best.get("score", 0.0) or 0.0)
-        except Exception:
-            pass
-        log.info(f"  Full-frame top: {b_cls} {b_sc:.3f} | raw={len(full_r)} triggered={full_t}")
 
-        if full_t:
-            log.warning(f"  >>> NSFW on full image: {fmt_detections(full_r)}")
-            return True, full_d, mon_idx, "full", full_r, img, img
+# ═══════════════════════════════════════════════════════════════════════════
+# LAYER V+ — Burst Scan (video frontmost)
+# ═══════════════════════════════════════════════════════════════════════════
 
-        # ─────────────────────────────────────────────────────────────
-        # PASS 1: coarse + overlaps in parallel (unchanged)
-        # ─────────────────────────────────────────────────────────────
-        log.info(f"  PASS 1 — Coarse {n_cols}×{n_rows} [parallel]")
+# frame: the window crop at native resolution; small: ≤BURST_SIDE copy for the batched pass
+BurstFrame = namedtuple("BurstFrame", "at mon_idx frame small")
 
-        coarse = make_grid(img, n_rows, prefix="c", n_cols=n_cols)
-        overlaps = make_overlaps(img, n_rows, n_cols=n_cols)
-        all_coarse = coarse + overlaps
 
-        import concurrent.futures
-        futures_list = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            for name, tile, box in all_coarse:
-                fut = executor.submit(scan_tile, detector, name, tile, mon_idx)
-                futures_list.append((fut, name, tile, box))
-
-        hot = []
-        first_trigger = None
-        for fut, name, tile, box in futures_list:
-            r, t, d = fut.result()
-            if t and first_trigger is None:
-                log.warning(f"  >>> NSFW on '{name}': {fmt_detections(r)}")
-                first_trigger = (True, d, mon_idx, name, r, img, tile)
-            elif has_interest(r):
-                hot.append((name, tile, box, r))
-
-        if first_trigger:
-            return first_trigger
-
-        # ─────────────────────────────────────────────────────────────
-        # PASS 2: fine scan only on hot tiles (unchanged)
-        # ─────────────────────────────────────────────────────────────
-        if hot:
-            log.info(f"  PASS 2 — Fine scan on {len(hot)} hot tile(s)")
-            for pname, pimg, pbox, pr in hot:
-                log.info(
-                    f"    Subdividing '{pname}' "
-                    f"({pimg.size[0]}x{pimg.size[1]}) into {FINE_GRID}x{FINE_GRID}"
-                )
-                subs = make_grid(pimg, FINE_GRID, prefix=f"{pname}_f")
-                for sname, simg, sbox in subs:
-                    r, t, d = scan_tile(detector, sname, simg, mon_idx)
-                    if t:
-                        log.warning(
-                            f"  >>> NSFW on '{sname}' (parent: {pname}): "
-                            f"{fmt_detections(r)}"
-                        )
-                        return True, d, mon_idx, sname, r, img, simg
-        else:
-            log.info("  PASS 2 — No hot tiles, skipped")
+class BurstBudget:
+    """CPU-time bucket for burst mode: credit accrues at `share` CPU-seconds
+    per wall second, capped at `cap`; bursts spend it and stop when it runs
+    out, so video playback costs at most `share` of a core in the long run."""
+
+    def __init__(self, share: float = BURST_CPU_SHARE, cap: float = BURST_CPU_MAX):
+        self.share, self.cap = share, cap
+        self._credit = cap
+        self._at = time.monotonic()
+
+    def credit(self) -> float:
+        now = time.monotonic()
+        self._credit = min(self.cap, self._credit + (now - self._at) * self.share)
+        self._at = now
+        return self._credit
+
+    def charge(self, cpu_seconds: float):
+        self.credit()
+        self._credit -= cpu_seconds
+
+
+_burst_budget = None
+
+
+def get_burst_budget() -> BurstBudget:
+    global _burst_budget
+    if _burst_budget is None:
+        cfg = load_config()
+        _burst_budget = BurstBudget(float(cfg.get("burst_cpu_share", BURST_CPU_SHARE)))
+    return _burst_budget
+
+
+def burst_target(windows: list) -> tuple:
+    """(reason, window) when the frontmost window shows video — a media app,
+    or a browser whose active tab is a video page — else (None, None)."""
+    front = next((w for w in windows if w.frontmost), None)
+    if front is None:
+        return None, None
+    if front.media:
+        return f"media app {front.owner}", front
+    if front.owner in BROWSERS and is_video_url(_active_tabs.get(front.owner, "")):
+        return f"video tab {classify_url(_active_tabs[front.owner]).domain}", front
+    return None, None
+
+
+def _window_display(win: WindowInfo, images: list) -> tuple:
+    """(mon_idx, display info) of the frame whose display holds win's centre,
+    or (None, None)."""
+    centre = (win.bounds[0] + win.bounds[2] / 2, win.bounds[1] + win.bounds[3] / 2)
+    for mon_idx, img in enumerate(images):
+        if _display_contains(img, centre):
+            return mon_idx, img.info["display"]
+    return None, None
+
+
+def _capture_window(win: WindowInfo, mon_idx: int = None, display: dict = None) -> tuple:
+    """(mon_idx, crop) of win, or (None, None).
+
+    With its display known, only the window's rect on that display is
+    captured; otherwise (or if that fails) a full capture is cropped.
+    """
+    if display is not None:
+        dx, dy, dw, dh = display["bounds"]
+        wx, wy, ww, wh = win.bounds
+        x1, y1 = max(wx, dx), max(wy, dy)
+        x2, y2 = min(wx + ww, dx + dw), min(wy + wh, dy + dh)
+        img = capture_rect(display, (x1, y1, x2 - x1, y2 - y1))
+        if img is not None:
+            return mon_idx, img
+    for mon_idx, img in enumerate(capture_screenshots()):
+        box = window_box(img, win)
+        if box is not None and _display_contains(
+                img, (win.bounds[0] + win.bounds[2] / 2, win.bounds[1] + win.bounds[3] / 2)):
+            return mon_idx, img.crop(box)
+    return None, None
+
+
+def layer_burst(windows: list, images: list = ()) -> tuple:
+    """Sample the frontmost video window at BURST_FPS into a ring buffer of
+    BURST_FRAMES downscaled frames and run the detector over them in
+    batches. Frames with interest (best first, at most BURST_ESCALATE) get
+    the full Layer V two-pass on their native-resolution crop.
+
+    Each frame captures only the window's rect on the display that holds
+    it in images (the cycle's frames). Bounded by the BurstBudget: no burst
+    without credit, and a burst stops once it has spent its credit or
+    BURST_CPU_MAX. Returns layer_V's tuple.
+    """
+    from PIL import Image
+    clear = (False, "", -1, "", [], None, None)
+    if not load_config().get("burst_mode", BURST_MODE):
+        return clear
+    reason, win = burst_target(windows)
+    if win is None:
+        return clear
+    budget = get_burst_budget()
+    allowance = min(budget.credit(), BURST_CPU_MAX)
+    log.info(f"LAYER V+ — Burst Scan ({reason})")
+    if allowance <= 0:
+        log.info(f"  CPU budget exhausted ({allowance:.2f}s) — skipped")
+        return clear
+
+    detector = get_detector()
+    win_mon, display = _window_display(win, images)
+    ring = deque(maxlen=BURST_FRAMES)
+    scored = []         # (best interest score, BurstFrame, results)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    period = 1.0 / BURST_FPS
+    next_at = time.monotonic()
+    captured = 0
+    try:
+        while captured < BURST_FRAMES and time.process_time() - cpu0 < allowance:
+            batch = []
+            while len(batch) < BURST_BATCH and captured < BURST_FRAMES:
+                time.sleep(max(0.0, next_at - time.monotonic()))
+                next_at = time.monotonic() + period
+                try:
+                    mon_idx, frame = _capture_window(win, win_mon, display)
+                except Exception as e:
+                    log.debug(f"  Burst capture failed: {e}")
+                    mon_idx = None
+                captured += 1
+                if mon_idx is None:
+                    continue
+                small = frame.copy()
+                small.thumbnail((BURST_SIDE, BURST_SIDE), Image.BILINEAR)
+                batch.append(BurstFrame(time.monotonic(), mon_idx, frame, small))
+            if not batch:
+                continue
+            ring.extend(batch)
+            for bf, r in zip(batch, detect_frames(detector, [b.small for b in batch])):
+                triggered, detail = check_triggered(r)
+                if triggered:
+                    log.warning(f"  >>> NSFW in burst frame {captured} on monitor "
+                                f"{bf.mon_idx}: {fmt_detections(r)}")
+                    return True, detail, bf.mon_idx, "burst", r, bf.frame, bf.small
+                if has_interest(r):
+                    scored.append((max(d.get("score", 0.0) for d in r), bf, r))
+    finally:
+        spent = time.process_time() - cpu0
+        budget.charge(spent)
+        metric_observe("burst", time.perf_counter() - wall0)
+
+    scored.sort(key=lambda x: -x[0])
+    log.info(f"  {len(ring)} frame(s) in {time.perf_counter() - wall0:.1f}s, "
+             f"CPU {spent:.2f}s | {len(scored)} with interest")
+    for score, bf, r in scored[:BURST_ESCALATE]:
+        log.info(f"  Escalating burst frame (interest {score:.3f}) to Layer V")
+        v_result = layer_V([bf.frame])
+        if v_result[0]:
+            _, detail, _, tile, results, _, timg = v_result
+            return True, detail, bf.mon_idx, f"burst_{tile}", results, bf.frame, timg
+    log.info("  Layer V+: CLEAR")
+    return clear
+
 
-    log.info("  Layer V: CLEAR")
-    return False, "", -1, "", [], None, None
-    
-    
 # ═══════════════════════════════════════════════════════════════════════════
 # LAYER C — Claude Contextual Classification (batched)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1898,6 +4123,7 @@ CLAUDE_SYSTEM_PROMPT = (
 )
 
 def layer_C(ambiguous_all: list) -> tuple:
+    import urllib.request
     if not ambiguous_all:
         log.info("LAYER C — Claude Classification")
         log.info("  No ambiguous matches — skipped")
@@ -1982,7 +4208,7 @@ def layer_B(tab_count: int) -> tuple:
                         _send_telegram(tg_token, p["telegram_chat_id"], msg)
                     except Exception:
                         pass
-        threading.Thread(target=_beh_alert, daemon=True).start()
+        get_executor().submit_io(_beh_alert)
         log.info("  Behavioral: ALERT LOGGED (no lock)")
         return False, ""  # Log only, no lock
     log.info(f"  Behavioral: ✓")
@@ -1995,76 +4221,245 @@ def layer_B(tab_count: int) -> tuple:
 def log_incident(reason: str, detail: str):
     ts = datetime.now().isoformat()
     try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)   # image-only mode skips setup_logging
         with open(LOG_FILE, "a") as f:
             f.write(f"[{ts}] {reason} | {detail}\n")
     except Exception:
         pass
 
-def get_running_apps() -> list:
-    output = _osascript('''
+def _as_str(text: str) -> str:
+    """AppleScript string literal."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _as_list(names) -> str:
+    """AppleScript list literal of quoted strings."""
+    return "{" + ", ".join(_as_str(n) for n in sorted(names)) + "}"
+
+
+# Per-app AppleScript timeouts share ENFORCE_APP_BUDGET seconds, so even a
+# screen full of hung apps ("save changes?" sheets blocking quit) finishes
+# inside ENFORCE_TIMEOUT and returns its output.
+ENFORCE_TIMEOUT = 30
+ENFORCE_APP_BUDGET = 24
+
+# Closes every running browser's windows; shared by the response script and
+# its browser-only fallback.
+_CLOSE_BROWSERS = '''repeat with appRef in browserApps
+    set appName to appRef as text
+    if runningApps contains appName and handled does not contain appName then
+        set res to "ok"
+        try
+            with timeout of perApp seconds
+                tell application appName to close every window
+            end timeout
+        on error errMsg
+            set res to errMsg
+        end try
+        set end of handled to appName
+        set out to out & "close|" & appName & "|" & res & linefeed
+    end if
+end repeat'''
+
+# One script does the whole response: read the front browser tab's URL
+# (before its window goes), close every browser's windows, then apply the
+# quit / close-windows / ⌘W / preserve policy to the other visible apps.
+# Apps are addressed through variables (and the URL probes via `run
+# script`) so the script compiles even when a listed app isn't installed.
+# Output is a "url||<url>" line and one "action|app|ok-or-error" line per
+# app.
+_ENFORCE_SCRIPT = '''
+set quitApps to %(quit)s
+set closeApps to %(close)s
+set keepApps to %(keep)s
+set browserApps to %(browsers)s
+set out to ""
+set handled to {}
 tell application "System Events"
-    set appList to ""
-    repeat with proc in (every application process whose visible is true)
-        set appList to appList & name of proc & linefeed
-    end repeat
-    return appList
+    set visibleApps to name of every application process whose visible is true
+    set runningApps to name of every application process
 end tell
-''')
-    return [a.strip() for a in output.split("\n") if a.strip()]
-
-def close_nsfw_window():
-    log.info("RESPONSE: Closing content...")
-    running = get_running_apps()
-    quit_list, closed_list, preserved_list = [], [], []
-    for app in running:
-        if app in APPS_PRESERVE:
-            preserved_list.append(app)
-        elif app in APPS_TO_QUIT:
-            _osascript(f'tell application "System Events"\n'
-                       f'if exists (process "{app}") then\n'
-                       f'tell application "{app}" to quit\n'
-                       f'end if\nend tell')
-            quit_list.append(app)
-        elif app in APPS_CLOSE_WINDOWS:
-            _osascript(f'tell application "System Events"\n'
-                       f'if exists (process "{app}") then\n'
-                       f'tell application "{app}"\ntry\n'
-                       f'close every window\nend try\n'
-                       f'end tell\nend if\nend tell')
-            closed_list.append(app)
+set perApp to 3
+set appCount to (count of visibleApps) + (count of browserApps)
+if appCount * perApp > %(budget)s then set perApp to %(budget)s div appCount
+if perApp < 1 then set perApp to 1
+set activeURL to ""
+%(url_probes)s
+set out to out & "url||" & activeURL & linefeed
+%(close_browsers)s
+repeat with appRef in visibleApps
+    set appName to appRef as text
+    set act to "window"
+    if handled contains appName then
+        set act to "skip"
+    else if keepApps contains appName then
+        set act to "preserve"
+    else if quitApps contains appName then
+        set act to "quit"
+    else if closeApps contains appName then
+        set act to "close"
+    end if
+    if act is not "skip" then
+        set res to "ok"
+        try
+            with timeout of perApp seconds
+                if act is "quit" then
+                    tell application appName to quit
+                else if act is "close" then
+                    tell application appName to close every window
+                else if act is "window" then
+                    tell application "System Events" to tell process appName to keystroke "w" using command down
+                end if
+            end timeout
+        on error errMsg
+            set res to errMsg
+        end try
+        set out to out & act & "|" & appName & "|" & res & linefeed
+    end if
+end repeat
+return out
+'''
+
+# Fallback when the response script was killed or failed: browsers only.
+_BROWSER_CLOSE_SCRIPT = '''
+set browserApps to %(browsers)s
+set out to ""
+set handled to {}
+tell application "System Events" to set runningApps to name of every application process
+set perApp to 3
+set activeURL to ""
+%(url_probes)s
+set out to out & "url||" & activeURL & linefeed
+%(close_browsers)s
+return out
+'''
+
+# Sent as its own osascript run so a slow cleanup can't time it out.
+_LOCK_SCRIPT = '''try
+    tell application "System Events" to keystroke "q" using {control down, command down}
+    return "ok"
+on error errMsg
+    return errMsg
+end try'''
+
+_URL_PROBE = '''if activeURL is "" and runningApps contains %(app)s then
+    try
+        set activeURL to (run script "tell application " & quote & %(app)s & quote & " to return %(expr)s") as text
+    end try
+end if'''
+
+# Front-tab URL expression per browser, in lookup order (Firefox has no
+# scriptable URL).
+_ACTIVE_URL_EXPR = {
+    "Google Chrome": "URL of active tab of front window",
+    "Safari": "URL of current tab of front window",
+    "Arc": "URL of active tab of front window",
+    "Brave Browser": "URL of active tab of front window",
+    "Microsoft Edge": "URL of active tab of front window",
+}
+
+Enforcement = namedtuple("Enforcement", "url outcomes locked")
+
+
+def _url_probes() -> str:
+    return "\n".join(
+        _URL_PROBE % {"app": _as_str(b), "expr": _ACTIVE_URL_EXPR[b]}
+        for b in BROWSERS if b in _ACTIVE_URL_EXPR)
+
+
+def build_enforcement_script() -> str:
+    """The response script with the Python-side app policy embedded."""
+    return _ENFORCE_SCRIPT % {
+        "quit": _as_list(APPS_TO_QUIT), "close": _as_list(APPS_CLOSE_WINDOWS),
+        "keep": _as_list(APPS_PRESERVE), "browsers": _as_list(BROWSERS),
+        "budget": ENFORCE_APP_BUDGET, "url_probes": _url_probes(),
+        "close_browsers": _CLOSE_BROWSERS}
+
+
+def build_browser_close_script() -> str:
+    """The browsers-only fallback script (URL probe, then close windows)."""
+    return _BROWSER_CLOSE_SCRIPT % {
+        "browsers": _as_list(BROWSERS), "url_probes": _url_probes(),
+        "close_browsers": _CLOSE_BROWSERS}
+
+
+def _parse_enforcement(output: str) -> tuple:
+    """(url, [(action, app, result)]) from an enforcement script's output."""
+    url, outcomes = "", []
+    for line in output.split("\n"):
+        parts = line.strip().split("|", 2)
+        if len(parts) != 3:
+            continue
+        if parts[0] == "url":
+            url = parts[2]
         else:
-            _osascript(f'tell application "System Events"\n'
-                       f'if exists (process "{app}") then\n'
-                       f'tell process "{app}"\ntry\n'
-                       f'keystroke "w" using command down\n'
-                       f'end try\nend tell\nend if\nend tell')
-            closed_list.append(f"{app} (window)")
-    for browser in BROWSERS:
-        if browser not in closed_list and browser not in quit_list:
-            _osascript(f'tell application "System Events"\n'
-                       f'if exists (process "{browser}") then\n'
-                       f'tell application "{browser}"\ntry\n'
-                       f'close every window\nend try\n'
-                       f'end tell\nend if\nend tell')
-    if quit_list:
-        log.info(f"  QUIT: {', '.join(quit_list)}")
-    if closed_list:
-        log.info(f"  CLOSED: {', '.join(closed_list)}")
-    if preserved_list:
-        log.info(f"  PRESERVED: {', '.join(preserved_list)}")
-    log.info("RESPONSE: Cleanup complete")
-
-def lock_screen():
-    global last_lock_time
-    now = time.time()
-    if now - last_lock_time < LOCK_COOLDOWN:
+            outcomes.append(tuple(parts))
+    return url, outcomes
+
+
+def close_nsfw_window(detected_at: float = None, lock: bool = False) -> Enforcement:
+    """Close/quit offending apps in one osascript run, then optionally lock.
+
+    Returns Enforcement(url, outcomes, locked): the front tab's URL as it was
+    before cleanup, [(action, app, result)] with result "ok" or the
+    AppleScript error, and whether the lock keystroke succeeded. If the
+    script times out or dies before reporting, the browser closes are re-run
+    on their own. The lock is a separate run (see lock_screen), so a cleanup
+    that hits its timeout still locks. With detected_at (perf_counter),
+    records detect→screen-clear / detect→lock.
+    """
+    log.info("RESPONSE: Closing content..." + (" (then lock)" if lock else ""))
+    t0 = time.perf_counter()
+    output, completed = _osascript_run(build_enforcement_script(), timeout=ENFORCE_TIMEOUT)
+    url, outcomes = _parse_enforcement(output)
+    if not completed or not output.startswith("url||"):
+        log.warning("  Cleanup script "
+                    + ("timed out" if not completed else "failed")
+                    + " — closing browser windows on their own")
+        retry_url, retry = _parse_enforcement(_osascript_run(
+            build_browser_close_script(), timeout=3 * len(BROWSERS) + 5)[0])
+        url = url or retry_url
+        outcomes += retry
+    metric_observe("enforce_script", time.perf_counter() - t0)
+    if detected_at is not None:
+        metric_observe("detect_to_clear", time.perf_counter() - detected_at)
+    locked = lock and lock_screen()
+    if locked and detected_at is not None:
+        metric_observe("detect_to_lock", time.perf_counter() - detected_at)
+
+    labels = {"quit": "QUIT", "close": "CLOSED", "window": "CLOSED", "preserve": "PRESERVED"}
+    grouped = {}
+    for action, app, result in outcomes:
+        name = f"{app} (window)" if action == "window" else app
+        grouped.setdefault(labels.get(action, action.upper()), []).append(name)
+        if result != "ok":
+            log.warning(f"  {action} {app} failed: {result}")
+    for label in ("QUIT", "CLOSED", "PRESERVED"):
+        if grouped.get(label):
+            log.info(f"  {label}: {', '.join(grouped[label])}")
+    log.info(f"RESPONSE: Cleanup complete ({(time.perf_counter() - t0) * 1000:.0f}ms"
+             + (f", {(time.perf_counter() - detected_at) * 1000:.0f}ms since detection)"
+                if detected_at is not None else ")"))
+    if locked:
+        log.info("RESPONSE: Screen locked")
+    return Enforcement(url, outcomes, locked)
+
+def lock_allowed() -> bool:
+    """True if the lock cooldown has expired."""
+    if time.time() - last_lock_time < LOCK_COOLDOWN:
         log.info("RESPONSE: Lock cooldown — skipped")
-        return
-    last_lock_time = now
-    _osascript('''
-tell application "System Events" to keystroke "q" using {control down, command down}
-''')
-    log.info("RESPONSE: Screen locked")
+        return False
+    return True
+
+def lock_screen() -> bool:
+    """Send the lock keystroke; the cooldown starts only if it succeeded."""
+    global last_lock_time
+    res = _osascript(_LOCK_SCRIPT, timeout=5)
+    if res != "ok":
+        log.warning(f"  Lock failed: {res or 'osascript error/timeout'}")
+        return False
+    last_lock_time = time.time()
+    return True
 
 def can_show_dialog() -> bool:
     global last_dialog_time
@@ -2088,8 +4483,9 @@ def show_dialog():
         pass
 
 def full_response(layer: str, detail: str, mon_idx=-1, tile_name="",
-                  results=None, full_img=None, tile_img=None):
+                  results=None, full_img=None, tile_img=None, detected_at=None):
     global enforcement_until
+    detected_at = detected_at if detected_at is not None else time.perf_counter()
     now = time.time()
     in_cooldown = now < enforcement_until
 
@@ -2103,29 +4499,31 @@ def full_response(layer: str, detail: str, mon_idx=-1, tile_name="",
         log.warning(f"{'='*50}")
         log_incident(layer, detail)
 
-    url = get_active_url()
+    # Clear the screen first: URL capture and cleanup are one script, the
+    # lock follows as its own. Everything slow (learning, audit PNGs, alert blur + sends) runs after,
+    # off the scan thread.
+    result = close_nsfw_window(detected_at, lock=not in_cooldown and lock_allowed())
+    url = result.url
     if url:
         log.info(f"RESPONSE: Active URL: {url}")
 
-    # Always close content, even during cooldown
-    close_nsfw_window()
-
     # During cooldown: stop here (no alerts/dialog/lock/audit)
     if in_cooldown:
         return
 
-    # Save audit if visual data available (only when not in cooldown)
-    if full_img and tile_img and mon_idx >= 0:
-        if url:
-            learn_url_visual(url)
-        save_audit(mon_idx, tile_name, results or [], full_img, tile_img,
-                   url or "", detail)
+    show_dialog()
 
-    # Fire alerts to all partners (only when not in cooldown)
-    fire_alerts(layer, detail, full_img)
+    def _followup():
+        # Save audit if visual data available (only when not in cooldown)
+        if full_img is not None and tile_img is not None and mon_idx >= 0:
+            if url:
+                learn_url_visual(url)
+            save_audit(mon_idx, tile_name, results or [], full_img, tile_img,
+                       url or "", detail)
+        # Fire alerts to all partners (only when not in cooldown)
+        fire_alerts(layer, detail, full_img)
 
-    show_dialog()
-    lock_screen()
+    get_executor().submit_io(_followup)
 
     # Start/extend enforcement cooldown window
     enforcement_until = time.time() + LOCK_COOLDOWN
@@ -2187,6 +4585,7 @@ def scan_cycle():
         images = capture_screenshots()
         for i, img in enumerate(images):
             log.info(f"  Monitor {i}: {img.size[0]}x{img.size[1]} captured")
+        publish_frames(images)
         _screenshot_fails = 0  # reset on success
     except Exception as e:
         log.error(f"  Screenshot failed: {e}")
@@ -2215,26 +4614,51 @@ def scan_cycle():
             except Exception:
                 pass
 
+    # Focused display first; unchanged displays wait until they go stale
+    scheduler = get_display_scheduler()
+    order = scheduler.plan(images) if images else []
+    regions = scheduler.regions(images, order) if order else {}
+
     ocr_words = 0
-    if images and not IMAGE_ONLY_MODE:
-        t1_hit, t1_detail, t1_ambiguous, ocr_words = layer_T1(images)
+    ocr_summary = ""
+    if order and not IMAGE_ONLY_MODE:
+        t1_hit, t1_detail, t1_ambiguous, ocr_words = layer_T1(images, order, regions)
         if t1_hit:
             full_response("OCR_EXPLICIT", t1_detail)
             return interval
         all_ambiguous.extend(t1_ambiguous)
+        cache = get_ocr_cache()
+        if cache.hits:
+            ocr_summary = f" ({cache.hits}/{cache.hits + cache.misses} cached, {cache.saved:.1f}s saved)"
 
     # ═══ Layer V: Visual Scan ═══
-    visual_summary = "skipped"
-    if images:
-        v_result = layer_V(images)
+    visual_summary = "skipped" if not images else "unchanged"
+    evidence = get_evidence_map()
+    if images and (order or any(evidence.targets(i, img) for i, img in enumerate(images))):
+        v_result = layer_V(images, order, regions, evidence)
+        evidence.end_cycle()
+        _log_first_full_scan()
         v_hit = v_result[0]
         if v_hit:
             _, v_detail, v_mon, v_tile, v_results, v_full, v_timg = v_result
             full_response("VISUAL", v_detail, v_mon, v_tile,
                           v_results, v_full, v_timg)
             return interval
-        visual_summary = (f"{images[0].size[0]}x{images[0].size[1]}"
-                          if images else "none")
+        scheduler.mark_scanned(images, order, regions)
+        visual_summary = f"{len(order)}/{len(images)} displays"
+        n_rois = sum(len(r.rois) for r in regions.values())
+        if n_rois:
+            deferred = sum(not r.background for r in regions.values())
+            visual_summary += f", {n_rois} ROI(s)" + (f", {deferred} ROI-only" if deferred else "")
+
+    # ═══ Layer V+: Burst Scan while video is frontmost ═══
+    if images:
+        b_result = layer_burst(scheduler.windows, images)
+        if b_result[0]:
+            _, b_detail, b_mon, b_tile, b_results, b_full, b_timg = b_result
+            full_response("VISUAL", b_detail, b_mon, b_tile,
+                          b_results, b_full, b_timg)
+            return interval
 
     # ═══ Layer C: Claude Classification ═══
     if all_ambiguous and not IMAGE_ONLY_MODE:
@@ -2252,11 +4676,12 @@ def scan_cycle():
 
     # ═══ All clear ═══
     log.info(f"SCAN #{scan_count} COMPLETE — ALL CLEAR | "
-             f"process:✓ tabs:{tab_count} ocr:{ocr_words}w "
+             f"process:✓ tabs:{tab_count} ocr:{ocr_words}w{ocr_summary} "
              f"visual:{visual_summary} claude:{claude_summary}")
 
     if scan_count % 100 == 0:
         check_tamper()
+        log_metrics()
 
     return interval
 
@@ -2274,6 +4699,14 @@ def parse_args():
                         help="Override Telegram bot token (also persists into config if resolution succeeds)")
     parser.add_argument("--wait", action="store_true", default=False,
                         help="Wait for Enter before fetching getUpdates (useful while partners are /starting)")
+    parser.add_argument("--quantize-model", metavar="FRAMES_DIR", default="",
+                        help="Build the INT8 detector, replay a labeled frame set against FP32 "
+                             "and enable INT8 only if the accuracy gate passes")
+    parser.add_argument("--quant-mode", choices=["dynamic", "static"], default="dynamic",
+                        help="onnxruntime quantization mode for --quantize-model")
+    parser.add_argument("--migrate-audit", action="store_true", default=False,
+                        help="Move images from existing audit incidents into the "
+                             "deduplicated blob store and rebuild the audit index")
     return parser.parse_args()
 
 def _image_only_relevant(results: list) -> list:
@@ -2351,6 +4784,7 @@ def image_only_scan_cycle():
     return SCAN_ACTIVE
 
 def run_image_only_main():
+    setup_logging()
     print("")
     print("=" * 50)
     print(f"  You Are Loved — Guardian v{VERSION} (IMAGE-ONLY)")
@@ -2373,20 +4807,231 @@ def run_image_only_main():
             next_interval = SCAN_ACTIVE
         time.sleep(next_interval)
 
+# ═══════════════════════════════════════════════════════════════════════════
+# DETECTOR QUANTIZATION (INT8 model + accuracy gate)
+# ═══════════════════════════════════════════════════════════════════════════
+
+_FRAME_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS if psutil is unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1_048_576
+    except ImportError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return peak / 1_048_576 if sys.platform == "darwin" else peak / 1024
+
+
+def _load_labeled_frames(frames_dir: Path) -> list:
+    """Load a labeled replay frame set.
+
+    Accepts either positive/ + negative/ subdirectories, or a flat directory
+    with labels.json mapping filename -> true/false. Unlabeled frames are
+    kept (label None) and only count towards FP32/INT8 agreement.
+    Returns [(name, PIL.Image, label), ...].
+    """
+    from PIL import Image
+    frames = []
+
+    def _add(path: Path, label):
+        try:
+            img = Image.open(path)
+            img.load()
+            frames.append((path.name, img.convert("RGB"), label))
+        except Exception as e:
+            log.warning(f"  Replay: skipping {path.name}: {e}")
+
+    pos_dir, neg_dir = frames_dir / "positive", frames_dir / "negative"
+    if pos_dir.is_dir() or neg_dir.is_dir():
+        for sub, label in ((pos_dir, True), (neg_dir, False)):
+            if sub.is_dir():
+                for p in sorted(sub.iterdir()):
+                    if p.suffix.lower() in _FRAME_EXTS:
+                        _add(p, label)
+        return frames
+
+    labels = {}
+    labels_file = frames_dir / "labels.json"
+    if labels_file.exists():
+        labels = json.loads(labels_file.read_text())
+    for p in sorted(frames_dir.iterdir()):
+        if p.suffix.lower() in _FRAME_EXTS:
+            label = labels.get(p.name)
+            _add(p, None if label is None else bool(label))
+    return frames
+
+
+def _replay_frames(detector, frames: list) -> dict:
+    """Run the full Layer V two-pass over each frame with the given detector."""
+    global _detector
+    saved = _detector
+    _detector = detector
+    triggered, latencies = [], []
+    try:
+        for name, img, _label in frames:
+            t0 = time.perf_counter()
+            v_result = layer_V([img])
+            latencies.append(time.perf_counter() - t0)
+            triggered.append(bool(v_result[0]))
+    finally:
+        _detector = saved
+    latencies.sort()
+    return {
+        "triggered": triggered,
+        "mean_ms": 1000 * sum(latencies) / max(1, len(latencies)),
+        "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+    }
+
+
+def quantize_detector_model(src: Path, dst: Path, mode: str = "dynamic",
+                            calib_frames: list = None):
+    """Write an INT8 copy of the detector with onnxruntime's quantization tools.
+
+    "dynamic" quantizes weights only and needs no data. "static" also
+    quantizes activations, calibrated on calib_frames (PIL images).
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if mode == "dynamic":
+        quantize_dynamic(str(src), str(dst), weight_type=QuantType.QUInt8)
+        return
+
+    import numpy as np
+    import onnxruntime
+    import nudenet.nudenet as _nn
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          quantize_static)
+    input_name = onnxruntime.InferenceSession(str(src)).get_inputs()[0].name
+
+    class _FrameReader(CalibrationDataReader):
+        def __init__(self, images):
+            # NudeNet expects BGR (cv2.imread order); reuse its letterbox
+            self._it = iter([
+                {input_name: _nn._read_image(np.asarray(im)[:, :, ::-1].copy(), 640)[0]}
+                for im in images
+            ])
+
+        def get_next(self):
+            return next(self._it, None)
+
+    quantize_static(str(src), str(dst), _FrameReader(calib_frames or []),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8)
+
+
+def run_quantization_gate(frames_dir: Path, mode: str = "dynamic") -> dict:
+    """Quantize the 640m model, replay a labeled frame set through FP32 and
+    INT8, and enable the INT8 model only if it keeps trigger agreement.
+
+    The report (latency, memory, agreement) is persisted to config under
+    detector_quant_gate; detector_model is set to "int8" only on pass.
+    """
+    from nudenet import NudeDetector
+
+    if not MODEL_FP32.exists():
+        raise FileNotFoundError(f"FP32 model not found: {MODEL_FP32}")
+    frames = _load_labeled_frames(frames_dir)
+    if not frames:
+        raise ValueError(f"No frames found in {frames_dir}")
+
+    quantize_detector_model(MODEL_FP32, MODEL_INT8, mode,
+                            calib_frames=[img for _, img, _ in frames])
+    _patch_nudenet_threshold()
+
+    stats = {}
+    for label, path in (("fp32", MODEL_FP32), ("int8", MODEL_INT8)):
+        rss_before = _rss_mb()
+        det = NudeDetector(model_path=str(path), inference_resolution=640)
+        rss_loaded = _rss_mb()
+        stats[label] = _replay_frames(det, frames)
+        stats[label]["load_rss_mb"] = round(rss_loaded - rss_before, 1)
+        stats[label]["rss_mb"] = round(_rss_mb(), 1)
+        stats[label]["model_mb"] = round(path.stat().st_size / 1_048_576, 1)
+        del det
+
+    fp, q = stats["fp32"]["triggered"], stats["int8"]["triggered"]
+    agree = sum(a == b for a, b in zip(fp, q)) / len(frames)
+    positives = [i for i, (_, _, lbl) in enumerate(frames) if lbl]
+    missed = [frames[i][0] for i in positives if fp[i] and not q[i]]
+
+    reasons = []
+    if not positives:
+        reasons.append("frame set has no labeled positive frames")
+    if agree < QUANT_MIN_AGREEMENT:
+        reasons.append(f"agreement {agree:.3f} < {QUANT_MIN_AGREEMENT}")
+    if missed:
+        reasons.append(f"INT8 missed {len(missed)} positive(s) FP32 caught")
+
+    def _recall(trig):
+        return (sum(1 for i in positives if trig[i]) / len(positives)) if positives else 0.0
+
+    report = {
+        "passed": not reasons,
+        "reasons": reasons,
+        "mode": mode,
+        "frames": len(frames),
+        "positives": len(positives),
+        "agreement": round(agree, 4),
+        "missed_positives": missed,
+        "checked_at": datetime.now().isoformat(),
+    }
+    for label in ("fp32", "int8"):
+        s = stats[label]
+        report[label] = {
+            "mean_ms": round(s["mean_ms"], 1), "p95_ms": round(s["p95_ms"], 1),
+            "load_rss_mb": s["load_rss_mb"], "rss_mb": s["rss_mb"],
+            "model_mb": s["model_mb"], "recall": round(_recall(s["triggered"]), 4),
+        }
+
+    cfg = load_config()
+    cfg["detector_quant_gate"] = report
+    cfg["detector_model"] = "int8" if report["passed"] else "fp32"
+    save_config(cfg)
+    return report
+
 # ═══════════════════════════════════════════════════════════════════════════
 # SCREEN RECORDING PERMISSION MONITOR
 # ═══════════════════════════════════════════════════════════════════════════
 
 _sr_degraded = False          # track state across checks
 _SR_CHECK_INTERVAL = 300      # 5 minutes
+_SR_FRAME_MAX_AGE = 120       # reuse scan_cycle frames up to this old
+
+
+def _luminance_std(img) -> float:
+    """Luminance std deviation on a 1/8 nearest-neighbour subsample of img
+    (a strided view of its cached full-resolution level — no resample)."""
+    import numpy as np
+    sample = frame_pyramid(img).level(1)[4::8, 4::8].astype(np.float32)
+    return float((sample @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).std())
+
+
+def _classify_luminance(std: float) -> str:
+    if std > 45:
+        return "yes"
+    elif std > 3:
+        return "wallpaper"
+    return "no"
 
 
 def _check_screen_recording_luminance() -> str:
     """Classify screen capture quality using luminance std deviation.
 
     Returns "yes" (std > 45 = full desktop), "wallpaper" (3-45), or "no".
+    Reuses the most recent scan_cycle frames when fresh; only captures on
+    its own (CGWindowListCreateImage) when the scanner hasn't produced any,
+    e.g. at startup or while the user is away.
     """
     try:
+        frames = recent_frames(_SR_FRAME_MAX_AGE)
+        if frames:
+            return _classify_luminance(max(_luminance_std(f) for f in frames))
+
         import Quartz
         cg_img = Quartz.CGWindowListCreateImage(
             Quartz.CGRectInfinite,
@@ -2400,20 +5045,12 @@ def _check_screen_recording_luminance() -> str:
         bpr = Quartz.CGImageGetBytesPerRow(cg_img)
         data = bytes(Quartz.CGDataProviderCopyData(
             Quartz.CGImageGetDataProvider(cg_img)))
-        if all(b == 0 for b in data[:2000]):
+        if not data[:2000].strip(b"\0"):
             return "no"
         from PIL import Image
         pil = Image.frombuffer(
-            "RGBA", (w, h), data, "raw", "BGRA", bpr, 1).convert("L")
-        pixels = list(pil.getdata())[::4]
-        n = len(pixels)
-        mean = sum(pixels) / n
-        std = (sum((p - mean) ** 2 for p in pixels) / n) ** 0.5
-        if std > 45:
-            return "yes"
-        elif std > 3:
-            return "wallpaper"
-        return "no"
+            "RGBA", (w, h), data, "raw", "BGRA", bpr, 1)
+        return _classify_luminance(_luminance_std(pil))
     except Exception as e:
         log.debug(f"  SR luminance check error: {e}")
         return "no"
@@ -2453,7 +5090,7 @@ def _fire_permission_alert(message: str):
                 except Exception as e:
                     log.error(f"  Permission alert email failed: {e}")
 
-    threading.Thread(target=_worker, daemon=True).start()
+    get_executor().submit_io(_worker)
 
 
 def screen_recording_monitor():
@@ -2464,10 +5101,18 @@ def screen_recording_monitor():
     """
     global _sr_degraded
     firstname = _get_user_firstname()
+    first_check = True
 
     while True:
         try:
             result = _check_screen_recording_luminance()
+            if first_check:
+                # Startup verdict (runs here so main() reaches its first scan sooner)
+                first_check = False
+                if result == "yes":
+                    log.info(f"  Screen Recording: verified (luminance OK)")
+                else:
+                    log.warning(f"  Screen Recording: DEGRADED ({result})")
             if result != "yes" and not _sr_degraded:
                 _sr_degraded = True
                 log.warning("PERMISSION_DEGRADED — Screen Recording not working")
@@ -2487,20 +5132,79 @@ def screen_recording_monitor():
         time.sleep(_SR_CHECK_INTERVAL)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# STARTUP PRELOAD (detector, OCR, regex warm-up)
+# ═══════════════════════════════════════════════════════════════════════════
+
+_preload_done = threading.Event()
+_first_full_scan_logged = False
+
+
+def preload_models():
+    """Background thread: load and warm everything Layer T1/V need.
+
+    Runs while the cheap layers (P/T2/T3) already scan, so the first full scan
+    after a (watchdog) restart does not pay model load + first-inference setup.
+    layer_V still calls get_detector(), which waits on the same lock if the
+    preload is mid-load rather than loading twice.
+    """
+    t0 = time.perf_counter()
+    try:
+        scan_text_tiers("you are loved", "preload")   # builds the NSFW matcher
+    except Exception as e:
+        log.debug(f"  Preload: text tiers failed: {e}")
+
+    if HAS_TESSERACT:
+        try:
+            from PIL import Image
+            get_tesseract().image_to_string(Image.new("L", (64, 32), 255), timeout=8)
+        except Exception as e:
+            log.debug(f"  Preload: tesseract warm-up failed: {e}")
+
+    try:
+        t_load = time.perf_counter()
+        detector = get_detector()
+        t_warm = time.perf_counter()
+        warm_detector(detector)
+        log.info(f"PRELOAD: detector load {t_warm - t_load:.2f}s, "
+                 f"warm-up inference {time.perf_counter() - t_warm:.2f}s")
+    except Exception as e:
+        log.warning(f"PRELOAD: detector warm-up failed: {e}")
+
+    log.info(f"PRELOAD: ready {time.perf_counter() - t0:.2f}s "
+             f"({time.perf_counter() - _STARTED_AT:.2f}s since start)")
+    _preload_done.set()
+
+
+def _log_first_full_scan():
+    global _first_full_scan_logged
+    if _first_full_scan_logged:
+        return
+    _first_full_scan_logged = True
+    log.info(f"STARTUP: first full scan complete "
+             f"{time.perf_counter() - _STARTED_AT:.2f}s after process start"
+             f" (preload {'done' if _preload_done.is_set() else 'still running'})")
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════
 
 def main():
+    setup_logging()
     AUDIT_DIR.mkdir(parents=True, exist_ok=True)
     cfg = first_run_setup()
 
+    # Load + warm detector/OCR while the rest of startup and the cheap layers run
+    threading.Thread(target=preload_models,
+                     daemon=True, name="preload").start()
+
     log.info("")
     log.info(f"{'='*50}")
     log.info(f"  You Are Loved — Guardian v{VERSION}")
     log.info(f"{'='*50}")
     log.info(f"  Layer P:  Process check")
-    log.info(f"  Layer T2: Browser tabs (Chrome + Safari)")
+    log.info(f"  Layer T2: Browser tabs ({', '.join(BROWSERS)})")
     log.info(f"  Layer T3: Confirmed memory recall")
     log.info(f"  Layer T1: OCR surface scan (3x3 grid)")
     log.info(f"  Layer V:  NudeNet {COARSE_GRID}x{COARSE_GRID} → "
@@ -2515,7 +5219,7 @@ def main():
     log.info(f"  Tesseract: {'✓' if HAS_TESSERACT else '✗'}")
     log.info(f"  Scan intervals: {SCAN_ACTIVE}s / {SCAN_IDLE}s / "
              f"{SCAN_DEEP_IDLE}s")
-    partners = fetch_server_partners()
+    partners = get_partners()   # server sync runs in the partner-sync thread
     log.info(f"  Partners: {len(partners)}")
     for p in partners:
         tg = p.get('telegram', '') or p.get('telegram_chat_id', '')
@@ -2538,28 +5242,21 @@ def main():
     mem = load_memory()
     log.info(f"  Memory: {len(mem.get('urls', {}))} URLs, "
              f"{len(mem.get('domains', {}))} domains")
-    log.info(f"  Audits: {len(list(AUDIT_DIR.glob('incident_*')))}")
+    log.info(f"  Audits: {get_audit_store().count()}")
 
     check_tamper()
 
-    # Start Screen Recording permission monitor
-    sr_result = _check_screen_recording_luminance()
-    if sr_result == "yes":
-        log.info(f"  Screen Recording: verified (luminance OK)")
-    else:
-        log.warning(f"  Screen Recording: DEGRADED ({sr_result})")
-        global _sr_degraded
-        _sr_degraded = True
-        firstname = _get_user_firstname()
-        _fire_permission_alert(
-            f"\u26a0\ufe0f Screen Recording permission was removed "
-            f"from {firstname}\u2019s Mac.\n"
-            f"Visual detection is disabled.")
+    # Screen Recording permission monitor — its first check reports startup state
     threading.Thread(target=screen_recording_monitor,
                      daemon=True, name="sr-monitor").start()
     threading.Thread(target=_partner_sync_loop,
                      daemon=True, name="partner-sync").start()
 
+    # launchd stops us with SIGTERM: exit through SystemExit so the atexit
+    # executor shutdown lets queued alerts and audit writes finish.
+    import signal
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     while True:
         try:
             next_interval = scan_cycle()
@@ -2607,6 +5304,45 @@ if __name__ == "__main__":
         else:
             print("Config updated: no")
         sys.exit(0)
+    if args.migrate_audit:
+        setup_logging()
+        try:
+            report = get_audit_store().migrate()
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(2)
+        print("\n=== Audit Migration ===")
+        print(f"Incidents migrated: {report['incidents']}")
+        print(f"Images: {report['images']} "
+              f"({report['blobs_new']} stored, {report['deduplicated']} deduplicated)")
+        print(f"Audit size: {report['bytes_before'] / 1_048_576:.1f}MB → "
+              f"{report['bytes_after'] / 1_048_576:.1f}MB")
+        sys.exit(0)
+    if args.quantize_model:
+        setup_logging()
+        try:
+            report = run_quantization_gate(Path(args.quantize_model).expanduser(),
+                                           mode=args.quant_mode)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(2)
+        print("\n=== Detector Quantization Gate ===")
+        print(f"Mode: {report['mode']} | Frames: {report['frames']} "
+              f"({report['positives']} labeled positive)")
+        for label in ("fp32", "int8"):
+            s = report[label]
+            print(f"  {label.upper()}: {s['mean_ms']:.0f}ms mean, {s['p95_ms']:.0f}ms p95 | "
+                  f"model {s['model_mb']}MB, +{s['load_rss_mb']}MB RSS on load | "
+                  f"recall {s['recall']:.3f}")
+        print(f"Trigger agreement: {report['agreement']:.3f} "
+              f"(required {QUANT_MIN_AGREEMENT})")
+        if report["passed"]:
+            print("PASSED — detector_model set to int8")
+            sys.exit(0)
+        for reason in report["reasons"]:
+            print(f"  ✗ {reason}")
+        print("FAILED — detector_model left at fp32")
+        sys.exit(1)
     if args.image_only:
         run_image_only_main()
     else: